@@ -0,0 +1,98 @@
+import argparse
+import asyncio
+import os
+import signal
+
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+from app.data import repo
+from app.data.db import connect, init_schema, read_schema
+from app.core.bootstrap import seed_if_empty
+from app.core.maintenance import DailyMaintenance
+from app.core.player import SoundPlayer, SOUND_CACHE_MB
+from app.core.scheduler import Scheduler
+from app.core.zones import ZoneScheduler
+
+def data_version(conn):
+    return conn.execute("PRAGMA data_version").fetchone()[0]
+
+def describe(ev):
+    if ev is None:
+        return "next: none"
+    return f'next: {ev.run_at.strftime("%Y-%m-%d %H:%M:%S")}  {ev.name}  ({ev.sound_name})'
+
+async def run(conn, scheduler, stop):
+    maintenance = DailyMaintenance(conn)
+    maintenance.run_if_due()
+    scheduler.start()
+    version = data_version(conn)
+    last = None
+
+    while not stop.is_set():
+        if scheduler.next_event != last:
+            last = scheduler.next_event
+            print(describe(last), flush=True)
+
+        delay = scheduler.next_wakeup()
+        if delay is None:
+            break
+
+        try:
+            await asyncio.wait_for(stop.wait(), timeout=delay)
+        except asyncio.TimeoutError:
+            pass
+        if stop.is_set():
+            break
+
+        scheduler.on_wakeup()
+        maintenance.run_if_due()
+        v = data_version(conn)
+        if v != version:
+            version = v
+            scheduler.reload()
+
+    scheduler.stop()
+
+async def main_async(args):
+    conn = connect(args.db, profile=bool(args.profile))
+    init_schema(conn, read_schema())
+    seed_if_empty(conn)
+
+    try:
+        cache_mb = int(repo.get_setting(conn, "sound_cache_mb", SOUND_CACHE_MB))
+    except:
+        cache_mb = SOUND_CACHE_MB
+    player = SoundPlayer(cache_mb * 1024 * 1024)
+    if args.zones:
+        scheduler = ZoneScheduler(conn, lambda output: player.voice())
+    else:
+        scheduler = Scheduler(conn, player)
+    stop = asyncio.Event()
+
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stop.set)
+        except (NotImplementedError, RuntimeError):
+            pass
+
+    try:
+        await run(conn, scheduler, stop)
+    finally:
+        if args.profile:
+            conn.stats.dump(args.profile)
+        conn.close()
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m app.core.daemon", description="Headless Mapl Tajong scheduler")
+    parser.add_argument("--db", default=None, help="SQLite DB path (default: the app's tajong.db)")
+    parser.add_argument("--zones", action="store_true", help="serve every enabled zone instead of the active set")
+    parser.add_argument("--profile", default=None, metavar="JSON", help="record per-statement query stats and write them here on exit")
+    args = parser.parse_args()
+    try:
+        asyncio.run(main_async(args))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
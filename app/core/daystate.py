@@ -0,0 +1,35 @@
+from datetime import timedelta
+from app.data import repo
+from app.core.timeline import HORIZON_DAYS
+
+class DayState:
+    def __init__(self, conn):
+        self.conn = conn
+        self.ordinal = None
+        self.date_str = ""
+        self.end_str = ""
+        self.paused = False
+        self.index = None
+        self._version = None
+
+    def reset(self):
+        self.ordinal = None
+        self._version = None
+
+    def get(self, now):
+        ordinal = now.toordinal()
+        if ordinal != self.ordinal:
+            self.ordinal = ordinal
+            self.date_str = now.strftime("%Y-%m-%d")
+            self.end_str = (now + timedelta(days=HORIZON_DAYS - 1)).strftime("%Y-%m-%d")
+            self._version = None
+
+        version = repo.overrides_version()
+        if version != self._version:
+            self.index = repo.load_overrides(self.conn, self.date_str, self.end_str)
+            self.paused = self.index.is_paused(self.date_str)
+            self._version = version
+        return self
+
+    def has(self, schedule_id, action):
+        return self.index.has(self.date_str, schedule_id, action)
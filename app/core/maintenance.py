@@ -0,0 +1,22 @@
+from datetime import date
+from app.data import repo
+
+class DailyMaintenance:
+    def __init__(self, conn):
+        self.conn = conn
+        self.last = None
+
+    def run_if_due(self, today=None):
+        today = today or date.today()
+        if today == self.last:
+            return False
+        self.last = today
+        try:
+            repo.compact_overrides(self.conn, today.strftime("%Y-%m-%d"))
+        except:
+            pass
+        try:
+            repo.apply_log_retention(self.conn, today)
+        except:
+            pass
+        return True
@@ -0,0 +1,66 @@
+import heapq
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+
+from app.data import repo
+
+WINDOW_DAYS = 7
+
+@dataclass
+class Occurrence:
+    set_id: int
+    schedule_id: int
+    name: str
+    run_at: datetime
+    sound_id: int
+    sound_name: str
+    sound_file_name: str
+    volume: float
+    status: str
+
+def _status(index, date_str, schedule_id):
+    if index.is_paused(date_str):
+        return "PAUSE_DAY"
+    if index.has(date_str, schedule_id, "FIRED_ONCE"):
+        return "FIRED_ONCE"
+    if index.has(date_str, schedule_id, "SKIP_ONCE"):
+        return "SKIP_ONCE"
+    return "SCHEDULED"
+
+def resolve(conn, stream):
+    index = None
+    date_ord = None
+    date_str = None
+    window_end = None
+
+    for run_at, set_id, e in stream:
+        if run_at.toordinal() != date_ord:
+            date_ord = run_at.toordinal()
+            date_str = run_at.strftime("%Y-%m-%d")
+            if index is None or date_str > window_end:
+                window_end = (run_at + timedelta(days=WINDOW_DAYS - 1)).strftime("%Y-%m-%d")
+                index = repo.load_overrides(conn, date_str, window_end)
+
+        yield Occurrence(
+            set_id=set_id,
+            schedule_id=e.schedule_id,
+            name=e.name,
+            run_at=run_at,
+            sound_id=e.sound_id,
+            sound_name=e.sound_name,
+            sound_file_name=e.sound_file_name,
+            volume=e.volume,
+            status=_status(index, date_str, e.schedule_id),
+        )
+
+def _tagged(timeline, set_id, start, end):
+    for run_at, e in timeline.iter_between(start, end):
+        yield run_at, set_id, e
+
+def iter_occurrences(conn, timelines, start, end):
+    streams = [_tagged(tl, set_id, start, end) for set_id, tl in timelines]
+    if len(streams) == 1:
+        merged = streams[0]
+    else:
+        merged = heapq.merge(*streams, key=lambda x: (x[0], x[1]))
+    return resolve(conn, merged)
@@ -38,4 +38,9 @@ def amp_cache_dir():
     return d
 
 def resource_path(*parts):
-    return base_dir().joinpath(*parts)
\ No newline at end of file
+    return base_dir().joinpath(*parts)
+
+def backups_dir():
+    d = app_data_dir() / "backups"
+    d.mkdir(parents=True, exist_ok=True)
+    return d
@@ -1,3 +1,4 @@
+from collections import OrderedDict
 from pathlib import Path
 import hashlib
 import wave
@@ -5,10 +6,71 @@ import audioop
 import pygame
 from app.core.paths import amp_cache_dir
 
+SOUND_CACHE_MB = 64
+
+class SoundCache:
+    def __init__(self, budget_bytes):
+        self.budget = int(budget_bytes)
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._items = OrderedDict()
+
+    def __len__(self):
+        return len(self._items)
+
+    def get(self, key):
+        item = self._items.get(key)
+        if item is None:
+            self.misses += 1
+            return None
+        self._items.move_to_end(key)
+        self.hits += 1
+        return item[0]
+
+    def put(self, key, snd, size):
+        if size > self.budget:
+            return
+        old = self._items.pop(key, None)
+        if old is not None:
+            self.bytes -= old[1]
+        self._items[key] = (snd, size)
+        self.bytes += size
+        self._shrink()
+
+    def set_budget(self, budget_bytes):
+        self.budget = int(budget_bytes)
+        self._shrink()
+
+    def _shrink(self):
+        while self.bytes > self.budget and self._items:
+            _, (_, size) = self._items.popitem(last=False)
+            self.bytes -= size
+            self.evictions += 1
+
+    def clear(self):
+        self._items.clear()
+        self.bytes = 0
+
+    def stats(self):
+        return {
+            "items": len(self._items),
+            "bytes": self.bytes,
+            "budget": self.budget,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
 class SoundPlayer:
-    def __init__(self):
+    def __init__(self, cache_bytes=SOUND_CACHE_MB * 1024 * 1024):
         pygame.mixer.init()
         self._cache = {}
+        self.sounds = SoundCache(cache_bytes)
+        self._prepared = None
+        self._channel = None
+        self.last_preload_hit = False
 
     def _amp_key(self, path, gain):
         s = f"{path}|{gain:.3f}".encode("utf-8")
@@ -53,18 +115,74 @@ class SoundPlayer:
         self._cache[key] = str(dst)
         return str(dst)
 
-    def play(self, path, volume):
-        p = Path(path)
-        if not p.exists():
-            raise FileNotFoundError(str(p))
-
+    def _clamp(self, volume):
         vol = float(volume) if volume is not None else 1.0
         if vol < 0.0:
             vol = 0.0
         if vol > 2.0:
             vol = 2.0
+        return vol
+
+    def _decode(self, path, vol):
+        snd = pygame.mixer.Sound(path)
+        if vol > 1.0:
+            sw = abs(pygame.mixer.get_init()[1]) // 8
+            snd = pygame.mixer.Sound(buffer=audioop.mul(snd.get_raw(), sw, vol))
+        return snd
+
+    def _sound_size(self, snd):
+        freq, fmt, channels = pygame.mixer.get_init()
+        return int(snd.get_length() * freq) * channels * (abs(fmt) // 8)
+
+    def _key(self, p, vol):
+        st = p.stat()
+        return (str(p), st.st_mtime_ns, st.st_size, vol if vol > 1.0 else 1.0)
+
+    def _sound(self, key):
+        snd = self.sounds.get(key)
+        if snd is None:
+            snd = self._decode(key[0], key[3])
+            self.sounds.put(key, snd, self._sound_size(snd))
+        return snd
+
+    def preload(self, path, volume):
+        p = Path(path)
+        if not p.exists():
+            raise FileNotFoundError(str(p))
+
+        key = self._key(p, self._clamp(volume))
+        if self._prepared is not None and self._prepared[0] == key:
+            return
+        self._prepared = (key, self._sound(key))
+
+    def voice(self):
+        return Voice(self)
 
+    def play(self, path, volume):
+        self._play(self, path, volume)
+
+    def _play(self, owner, path, volume):
+        p = Path(path)
+        if not p.exists():
+            raise FileNotFoundError(str(p))
+
+        vol = self._clamp(volume)
         src = str(p)
+        key = self._key(p, vol)
+
+        owner.last_preload_hit = self._prepared is not None and self._prepared[0] == key
+        try:
+            snd = self._prepared[1] if owner.last_preload_hit else self._sound(key)
+        except pygame.error:
+            snd = None
+
+        owner._stop_channel()
+        if snd is not None:
+            snd.set_volume(1.0 if vol > 1.0 else vol)
+            pygame.mixer.music.stop()
+            owner._channel = snd.play()
+            return
+
         if vol > 1.0:
             src = self._amplify_wav(str(p), vol)
             pygame.mixer.music.load(src)
@@ -76,7 +194,17 @@ class SoundPlayer:
         pygame.mixer.music.set_volume(vol)
         pygame.mixer.music.play()
 
+    def _stop_channel(self):
+        if self._channel is not None:
+            self._channel.stop()
+            self._channel = None
+
     def stop(self):
+        self._channel = None
+        try:
+            pygame.mixer.stop()
+        except:
+            pass
         try:
             pygame.mixer.music.stop()
         except:
@@ -84,4 +212,24 @@ class SoundPlayer:
         try:
             pygame.mixer.music.unload()
         except:
-            pass
\ No newline at end of file
+            pass
+
+class Voice:
+    def __init__(self, player):
+        self.player = player
+        self._channel = None
+        self.last_preload_hit = False
+
+    def preload(self, path, volume):
+        self.player.preload(path, volume)
+
+    def play(self, path, volume):
+        self.player._play(self, path, volume)
+
+    def _stop_channel(self):
+        if self._channel is not None:
+            self._channel.stop()
+            self._channel = None
+
+    def stop(self):
+        self._stop_channel()
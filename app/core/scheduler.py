@@ -1,7 +1,17 @@
+import time
 from dataclasses import dataclass
 from datetime import datetime, timedelta
 from app.data import repo
 from app.core.paths import sound_file_path
+from app.core.timelines import TimelineCache
+from app.core.daystate import DayState
+from app.core.occurrences import iter_occurrences
+
+MAX_WAIT_SECONDS = 300.0
+PREWARM_SECONDS = 5.0
+
+def ms_str(dt):
+    return dt.strftime("%Y-%m-%d %H:%M:%S.") + f"{dt.microsecond // 1000:03d}"
 
 def weekday_bit(dt):
     return 1 << dt.weekday()
@@ -20,17 +30,34 @@ class NextEvent:
     volume: float
 
 class Scheduler:
-    def __init__(self, conn, player):
+    def __init__(self, conn, player, set_id=None, clock=None, timelines=None, day=None):
         self.conn = conn
         self.player = player
+        self.set_id = set_id
+        self.clock = clock or datetime.now
         self.running = False
         self.paused = False
         self.next_event = None
+        self._skipped = []
         self._last_second = None
+        self.timelines = timelines or TimelineCache(conn)
+        self._timeline_set_id = None
+        self._deadline = None
+        self._lag = 0.0
+        self._warm = None
+        self.prewarm_seconds = PREWARM_SECONDS
+        self.changed = None
+        self.day = day or DayState(conn)
 
     def start(self):
+        try:
+            self.prewarm_seconds = float(repo.get_setting(self.conn, "prewarm_seconds", PREWARM_SECONDS))
+        except:
+            self.prewarm_seconds = PREWARM_SECONDS
         self.running = True
         self.paused = False
+        self.timelines.start()
+        repo.subscribe(self.on_data_changed)
         self.recompute_next()
 
     def pause(self):
@@ -40,15 +67,53 @@ class Scheduler:
         self.paused = False
 
     def stop(self):
+        repo.unsubscribe(self.on_data_changed)
+        self.timelines.stop()
         self.running = False
         self.next_event = None
+        self._skipped = []
+
+    def next_wakeup(self, cap=MAX_WAIT_SECONDS):
+        if not self.running:
+            return None
+
+        now = self.clock()
+        ev = self.next_event
+        due = ev.run_at if ev else None
+        if ev is not None and self._warm != ev and self.prewarm_seconds > 0:
+            due = ev.run_at - timedelta(seconds=self.prewarm_seconds)
+        if self._skipped and (due is None or self._skipped[0].run_at < due):
+            due = self._skipped[0].run_at
+
+        if due is None or self.paused:
+            delay = MAX_WAIT_SECONDS
+        else:
+            remain = (due - now).total_seconds()
+            if remain <= 0 and self.day.get(now).paused:
+                delay = MAX_WAIT_SECONDS
+            elif remain > self._lag:
+                delay = remain - self._lag
+                if cap is not None:
+                    delay = min(delay, cap)
+            else:
+                delay = max(remain, 0.0)
+
+        self._deadline = time.monotonic() + delay
+        return delay
+
+    def on_wakeup(self):
+        if self._deadline is not None:
+            late = time.monotonic() - self._deadline
+            if 0.0 <= late < 1.0:
+                self._lag = self._lag * 0.8 + late * 0.2
+            self._deadline = None
+        self.tick()
 
     def skip_next_once(self):
         ev = self.next_event
         if not ev:
             return
-        today = datetime.now().strftime("%Y-%m-%d")
-        repo.add_override(self.conn, today, ev.schedule_id, "SKIP_ONCE", "admin")
+        repo.add_override(self.conn, ev.run_at.strftime("%Y-%m-%d"), ev.schedule_id, "SKIP_ONCE", "admin")
         self.recompute_next()
 
 
@@ -57,28 +122,45 @@ class Scheduler:
         if not ev:
             return
         self._ring(ev, forced=True)
-        today = datetime.now().strftime("%Y-%m-%d")
-        repo.add_override(self.conn, today, ev.schedule_id, "FIRED_ONCE", "forced")
+        repo.add_override(self.conn, ev.run_at.strftime("%Y-%m-%d"), ev.schedule_id, "FIRED_ONCE", "forced")
         self.recompute_next()
 
     def tick(self):
         if not self.running or self.paused:
             return
 
-        today = datetime.now().strftime("%Y-%m-%d")
-        if repo.is_pause_today(self.conn, today):
+        now = self.clock()
+        day = self.day.get(now)
+        if day.paused:
             return
 
-        now = datetime.now()
-        if self._last_second == now.second:
+        second = now.replace(microsecond=0)
+        if self._last_second == second:
             return
-        self._last_second = now.second
+        self._last_second = second
+
+        while self._skipped and self._skipped[0].run_at <= now:
+            ev = self._skipped.pop(0)
+            repo.insert_log(
+                self.conn,
+                now.strftime("%Y-%m-%d %H:%M:%S"),
+                ev.schedule_id,
+                ev.name,
+                ev.sound_name,
+                "SKIPPED",
+                "",
+                scheduled_at=ms_str(ev.run_at),
+                detected_at=ms_str(now)
+            )
 
         if not self.next_event:
             self.recompute_next()
             return
 
         if now < self.next_event.run_at:
+            if self._warm != self.next_event and self.prewarm_seconds > 0:
+                if (self.next_event.run_at - now).total_seconds() <= self.prewarm_seconds:
+                    self._prewarm(self.next_event)
             return
         
         late = int((now - self.next_event.run_at).total_seconds())
@@ -90,14 +172,17 @@ class Scheduler:
                 self.next_event.name,
                 self.next_event.sound_name,
                 "MISSED",
-                f"late={late}s"
+                f"late={late}s",
+                scheduled_at=ms_str(self.next_event.run_at),
+                detected_at=ms_str(now),
+                latency_ms=int((now - self.next_event.run_at).total_seconds() * 1000)
             )
             self.recompute_next()
             return
 
         sid = self.next_event.schedule_id
 
-        if repo.has_override(self.conn, today, sid, "SKIP_ONCE"):
+        if day.has(sid, "SKIP_ONCE"):
             repo.insert_log(
                 self.conn,
                 now.strftime("%Y-%m-%d %H:%M:%S"),
@@ -105,98 +190,118 @@ class Scheduler:
                 self.next_event.name,
                 self.next_event.sound_name,
                 "SKIPPED",
-                ""
+                "",
+                scheduled_at=ms_str(self.next_event.run_at),
+                detected_at=ms_str(now)
             )
             self.recompute_next()
             return
 
-        self._ring(self.next_event, forced=False)
-        repo.add_override(self.conn, today, sid, "FIRED_ONCE", "auto")
+        self._ring(self.next_event, forced=False, detected=now)
+        repo.add_override(self.conn, day.date_str, sid, "FIRED_ONCE", "auto")
         self.recompute_next()
 
 
-    def recompute_next(self):
-        now = datetime.now()
-        today = datetime.now().strftime("%Y-%m-%d")
-        repo.clear_transient_overrides(self.conn, today)
-        set_id = repo.active_set_id(self.conn)
-        schedules = repo.list_schedules(self.conn, set_id)
-        best = None
-
-        for day_offset in range(0, 8):
-            base = (now + timedelta(days=day_offset)).replace(hour=0, minute=0, second=0, microsecond=0)
-            date_str = base.strftime("%Y-%m-%d")
-            day_bit = weekday_bit(base)
+    def invalidate(self):
+        self.timelines.clear()
 
-            for s in schedules:
-                if int(s["enabled"]) != 1:
-                    continue
-                if (int(s["weekday_mask"]) & day_bit) == 0:
-                    continue
-
-                run_at = next_dt(base, str(s["time_hhmm"]))
-                if day_offset == 0 and run_at <= now:
-                    continue
-
-                sid = int(s["id"])
-
-                if repo.has_override(self.conn, date_str, sid, "SKIP_ONCE"):
-                    continue
-                if repo.has_override(self.conn, date_str, sid, "FIRED_ONCE"):
-                    continue
+    def reload(self):
+        self.invalidate()
+        self.day.reset()
+        self.recompute_next()
 
-                v = s["volume_override"] if s["volume_override"] is not None else s["sound_volume"]
-                ev = NextEvent(
-                    schedule_id=sid,
-                    name=str(s["name"]),
-                    run_at=run_at,
-                    sound_name=str(s["sound_name"]),
-                    sound_file_name=str(s["sound_file_name"]),
-                    volume=float(v),
-                )
+    def on_data_changed(self, kind, op, key):
+        if kind == "schedule":
+            pass
+        elif kind == "sound":
+            if op == "insert":
+                return
+        elif kind == "setting":
+            if key != "active_set_id" or self.set_id is not None:
+                return
+        elif kind == "schedule_set":
+            if op not in ("delete", "reload") or key != self._timeline_set_id:
+                return
+        else:
+            return
 
-                if best is None or ev.run_at < best.run_at:
-                    best = ev
+        if self.running:
+            self.recompute_next()
+            if self.changed is not None:
+                self.changed(self)
+
+    def _get_timeline(self):
+        set_id = self.set_id if self.set_id is not None else self.timelines.active_set_id()
+        self._timeline_set_id = set_id
+        return self.timelines.get(set_id)
+
+    def _event(self, e, run_at):
+        return NextEvent(
+            schedule_id=e.schedule_id,
+            name=e.name,
+            run_at=run_at,
+            sound_name=e.sound_name,
+            sound_file_name=e.sound_file_name,
+            volume=e.volume,
+        )
 
-            if best is not None:
-                break
+    def recompute_next(self):
+        now = self.clock()
+        self.next_event, self._skipped = self._next_in(self._get_timeline(), now, self.day.get(now).index)
 
-        self.next_event = best
+    def preview_next(self, set_id):
+        now = self.clock()
+        best, _ = self._next_in(self.timelines.get(set_id), now, self.day.get(now).index)
+        return best
 
-    def _first_event_from(self, base):
-        set_id = repo.active_set_id(self.conn)
-        schedules = repo.list_schedules(self.conn, set_id)
+    def _next_in(self, timeline, now, index):
         best = None
-        today = base.strftime("%Y-%m-%d")
-        for s in schedules:
-            if int(s["enabled"]) != 1:
+        skipped = []
+        date_str = None
+        date_ord = None
+        for run_at, e in timeline.iter_from(now):
+            if run_at.toordinal() != date_ord:
+                date_ord = run_at.toordinal()
+                date_str = run_at.strftime("%Y-%m-%d")
+            if index.has(date_str, e.schedule_id, "FIRED_ONCE"):
                 continue
-            if (int(s["weekday_mask"]) & weekday_bit(base)) == 0:
+            if index.has(date_str, e.schedule_id, "SKIP_ONCE"):
+                skipped.append(self._event(e, run_at))
                 continue
+            best = self._event(e, run_at)
+            break
+        return best, skipped
+
+    def iter_occurrences(self, start, end):
+        tl = self._get_timeline()
+        return iter_occurrences(self.conn, [(self._timeline_set_id, tl)], start, end)
 
-            run_at = next_dt(base, str(s["time_hhmm"]))
-            sid = int(s["id"])
-            if repo.has_skip_once(self.conn, today, sid):
+    def _first_event_from(self, base):
+        today = base.strftime("%Y-%m-%d")
+        index = repo.load_overrides(self.conn, today, today)
+        for run_at, e in self._get_timeline().iter_day(base):
+            if index.has(today, e.schedule_id, "SKIP_ONCE"):
                 continue
+            return self._event(e, run_at)
+        return None
 
-            v = s["volume_override"] if s["volume_override"] is not None else s["sound_volume"]
-            ev = NextEvent(
-                schedule_id=sid,
-                name=str(s["name"]),
-                run_at=run_at,
-                sound_name=str(s["sound_name"]),
-                sound_file_name=str(s["sound_file_name"]),
-                volume=float(v),
-            )
-            if best is None or ev.run_at < best.run_at:
-                best = ev
-        return best
+    def _prewarm(self, ev):
+        self._warm = ev
+        preload = getattr(self.player, "preload", None)
+        if preload is None:
+            return
+        try:
+            preload(str(sound_file_path(ev.sound_file_name)), ev.volume)
+        except:
+            pass
 
-    def _ring(self, ev, forced):
-        now_str = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    def _ring(self, ev, forced, detected=None):
+        detected = detected or self.clock()
+        now_str = detected.strftime("%Y-%m-%d %H:%M:%S")
         try:
             p = sound_file_path(ev.sound_file_name)
             self.player.play(str(p), ev.volume)
+            played = self.clock()
             repo.insert_log(
                 self.conn,
                 now_str,
@@ -204,7 +309,12 @@ class Scheduler:
                 ev.name,
                 ev.sound_name,
                 "PLAYED",
-                "forced" if forced else ""
+                "forced" if forced else "",
+                scheduled_at=ms_str(ev.run_at),
+                detected_at=ms_str(detected),
+                played_at=ms_str(played),
+                latency_ms=None if forced else int((played - ev.run_at).total_seconds() * 1000),
+                preload_hit=getattr(self.player, "last_preload_hit", None)
             )
         except Exception as e:
             repo.insert_log(
@@ -214,5 +324,7 @@ class Scheduler:
                 ev.name,
                 ev.sound_name,
                 "FAILED",
-                str(e)
+                str(e),
+                scheduled_at=ms_str(ev.run_at),
+                detected_at=ms_str(detected)
             )
@@ -0,0 +1,102 @@
+import csv
+import json
+from pathlib import Path
+
+from app.data import repo
+
+DAY_NAMES = "월화수목금토일"
+
+FIELDS = ["name", "days", "time", "sound_name", "sound_file", "sound_volume", "volume", "enabled"]
+
+def mask_to_days(mask):
+    return "".join(d for i, d in enumerate(DAY_NAMES) if int(mask) & (1 << i))
+
+def days_to_mask(text):
+    text = str(text).strip()
+    if text.isdigit():
+        return int(text)
+    mask = 0
+    for ch in text:
+        i = DAY_NAMES.find(ch)
+        if i >= 0:
+            mask |= 1 << i
+    return mask
+
+def _normalize_time(text):
+    h, m = str(text).strip().split(":")
+    h, m = int(h), int(m)
+    if not (0 <= h <= 23 and 0 <= m <= 59):
+        raise ValueError(text)
+    return f"{h:02d}:{m:02d}"
+
+def _opt_float(v):
+    if v is None or str(v).strip() == "":
+        return None
+    return float(v)
+
+def _flag(v):
+    if v is None or str(v).strip() == "":
+        return 1
+    return 0 if str(v).strip().lower() in ("0", "false", "no", "n", "off") else 1
+
+def _parse_row(n, d):
+    try:
+        name = str(d.get("name") or "").strip()
+        mask = days_to_mask(d.get("days", ""))
+        sound_file = str(d.get("sound_file") or "").strip()
+        if not name or mask == 0 or not sound_file:
+            raise ValueError
+        sound_volume = _opt_float(d.get("sound_volume"))
+        return {
+            "name": name,
+            "weekday_mask": mask,
+            "time_hhmm": _normalize_time(d.get("time", "")),
+            "sound_name": str(d.get("sound_name") or "").strip(),
+            "sound_file_name": sound_file,
+            "sound_volume": 1.0 if sound_volume is None else sound_volume,
+            "volume_override": _opt_float(d.get("volume")),
+            "enabled": _flag(d.get("enabled")),
+        }
+    except:
+        raise ValueError(f"{n}번째 항목을 읽을 수 없습니다: {d}")
+
+def schedule_to_dict(s):
+    return {
+        "name": str(s["name"]),
+        "days": mask_to_days(s["weekday_mask"]),
+        "time": str(s["time_hhmm"]),
+        "sound_name": str(s["sound_name"]),
+        "sound_file": str(s["sound_file_name"]),
+        "sound_volume": float(s["sound_volume"]),
+        "volume": None if s["volume_override"] is None else float(s["volume_override"]),
+        "enabled": int(s["enabled"]),
+    }
+
+def export_set(conn, set_id, path):
+    path = Path(path)
+    items = [schedule_to_dict(s) for s in repo.list_schedules(conn, set_id)]
+
+    if path.suffix.lower() == ".json":
+        row = conn.execute("SELECT name FROM schedule_sets WHERE id=?", (int(set_id),)).fetchone()
+        data = {"set": row["name"] if row else "", "schedules": items}
+        path.write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding="utf-8")
+    else:
+        with path.open("w", encoding="utf-8-sig", newline="") as f:
+            w = csv.DictWriter(f, fieldnames=FIELDS)
+            w.writeheader()
+            for d in items:
+                w.writerow({k: ("" if d[k] is None else d[k]) for k in FIELDS})
+    return len(items)
+
+def read_file(path):
+    path = Path(path)
+    if path.suffix.lower() == ".json":
+        data = json.loads(path.read_text(encoding="utf-8-sig"))
+        items = data.get("schedules", []) if isinstance(data, dict) else data
+    else:
+        with path.open("r", encoding="utf-8-sig", newline="") as f:
+            items = list(csv.DictReader(f))
+    return [_parse_row(n, d) for n, d in enumerate(items, start=1)]
+
+def import_set(conn, set_id, path, replace=False):
+    return repo.import_schedules(conn, set_id, read_file(path), replace)
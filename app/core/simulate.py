@@ -0,0 +1,95 @@
+import argparse
+import sqlite3
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+
+from app.data import repo
+from app.core.scheduler import Scheduler
+
+class VirtualClock:
+    def __init__(self, start):
+        self.now = start
+
+    def __call__(self):
+        return self.now
+
+    def advance_to(self, t):
+        if t > self.now:
+            self.now = t
+
+class NullPlayer:
+    def __init__(self):
+        self.plays = 0
+
+    def play(self, path, volume):
+        self.plays += 1
+
+    def stop(self):
+        pass
+
+def scratch_copy(conn):
+    dst = sqlite3.connect(":memory:")
+    conn.backup(dst)
+    dst.row_factory = sqlite3.Row
+    dst.execute("PRAGMA foreign_keys = ON;")
+    return dst
+
+def simulate(conn, start, end, set_id=None, latency=0.0, pause_days=()):
+    for d in pause_days:
+        repo.set_pause_today(conn, d, True)
+
+    first_id = conn.execute("SELECT COALESCE(MAX(id), 0) FROM logs").fetchone()[0]
+
+    clock = VirtualClock(start)
+    player = NullPlayer()
+    sch = Scheduler(conn, player, set_id=set_id, clock=clock)
+    sch.start()
+
+    late = timedelta(seconds=latency)
+    while True:
+        delay = sch.next_wakeup()
+        at = clock.now + timedelta(seconds=delay)
+        if at > end:
+            break
+        clock.advance_to(at + late)
+        sch.on_wakeup()
+
+    sch.stop()
+    return conn.execute("SELECT * FROM logs WHERE id > ? ORDER BY id ASC", (first_id,)).fetchall()
+
+def main():
+    from app.data.db import connect, init_schema, read_schema
+
+    parser = argparse.ArgumentParser(prog="python -m app.core.simulate", description="Fast-forward the scheduler against a scratch copy of the DB")
+    parser.add_argument("--db", default=None)
+    parser.add_argument("--from", dest="start", required=True, help="YYYY-MM-DD")
+    parser.add_argument("--to", dest="end", required=True, help="YYYY-MM-DD (inclusive)")
+    parser.add_argument("--set-id", type=int, default=None)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every wakeup")
+    parser.add_argument("--pause", action="append", default=[], help="PAUSE_DAY date, repeatable")
+    parser.add_argument("--show", action="store_true", help="print every log row")
+    args = parser.parse_args()
+
+    src = connect(args.db)
+    init_schema(src, read_schema())
+    conn = scratch_copy(src)
+    src.close()
+
+    start = datetime.strptime(args.start, "%Y-%m-%d")
+    end = datetime.strptime(args.end, "%Y-%m-%d") + timedelta(days=1) - timedelta(microseconds=1)
+
+    t0 = time.perf_counter()
+    rows = simulate(conn, start, end, args.set_id, args.latency, args.pause)
+    elapsed = time.perf_counter() - t0
+
+    if args.show:
+        for r in rows:
+            print(f'{r["occurred_at"]}\t{r["result"]}\t{r["schedule_name"] or ""}\t{r["sound_name"] or ""}\t{r["detail"] or ""}')
+
+    counts = Counter(str(r["result"]) for r in rows)
+    summary = "  ".join(f"{k}={v}" for k, v in sorted(counts.items()))
+    print(f"{args.start} ~ {args.end}: {len(rows)} rows  {summary}  ({elapsed:.2f}s)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+from bisect import bisect_left, bisect_right
+from datetime import timedelta
+
+DAY_MINUTES = 24 * 60
+WEEK_MINUTES = 7 * DAY_MINUTES
+HORIZON_DAYS = 8
+
+def minute_of_week(dt):
+    return dt.weekday() * DAY_MINUTES + dt.hour * 60 + dt.minute
+
+def week_keys(e):
+    return [wd * DAY_MINUTES + e.minute for wd in range(7) if e.weekday_mask & (1 << wd)]
+
+class WeeklyTimeline:
+    def __init__(self, records):
+        slots = []
+        self.by_id = {}
+        for e in records:
+            if not e.active:
+                continue
+            self.by_id[e.schedule_id] = e
+            for k in week_keys(e):
+                slots.append((k, e.schedule_id, e))
+
+        slots.sort(key=lambda x: (x[0], x[1]))
+        self.keys = [k for k, _, _ in slots]
+        self.entries = [e for _, _, e in slots]
+
+    def remove(self, schedule_id):
+        e = self.by_id.pop(int(schedule_id), None)
+        if e is None:
+            return
+        for k in week_keys(e):
+            i = bisect_left(self.keys, k)
+            while i < len(self.keys) and self.keys[i] == k:
+                if self.entries[i] is e:
+                    del self.keys[i]
+                    del self.entries[i]
+                    break
+                i += 1
+
+    def add(self, e):
+        self.remove(e.schedule_id)
+        if not e.active:
+            return
+        self.by_id[e.schedule_id] = e
+        for k in week_keys(e):
+            i = bisect_left(self.keys, k)
+            while i < len(self.keys) and self.keys[i] == k and self.entries[i].schedule_id < e.schedule_id:
+                i += 1
+            self.keys.insert(i, k)
+            self.entries.insert(i, e)
+
+    def sound_schedule_ids(self, sound_id):
+        return [sid for sid, e in self.by_id.items() if e.sound_id == int(sound_id)]
+
+    def __len__(self):
+        return len(self.keys)
+
+    def iter_from(self, now, days=HORIZON_DAYS):
+        n = len(self.keys)
+        if n == 0:
+            return
+
+        midnight = now.replace(hour=0, minute=0, second=0, microsecond=0)
+        week_start = now.weekday() * DAY_MINUTES
+        limit = week_start + days * DAY_MINUTES
+
+        i = bisect_right(self.keys, minute_of_week(now))
+        lap = 0
+        while True:
+            if i == n:
+                i = 0
+                lap += WEEK_MINUTES
+            key = lap + self.keys[i]
+            if key >= limit:
+                return
+
+            day, minute = divmod(key - week_start, DAY_MINUTES)
+            run_at = (midnight + timedelta(days=day)).replace(hour=minute // 60, minute=minute % 60)
+            yield run_at, self.entries[i]
+            i += 1
+
+    def iter_between(self, start, end):
+        n = len(self.keys)
+        if n == 0:
+            return
+
+        midnight = start.replace(hour=0, minute=0, second=0, microsecond=0)
+        week_start = start.weekday() * DAY_MINUTES
+        first = minute_of_week(start)
+        if start.second or start.microsecond:
+            first += 1
+
+        i = bisect_left(self.keys, first)
+        lap = 0
+        while True:
+            if i == n:
+                i = 0
+                lap += WEEK_MINUTES
+            day, minute = divmod(lap + self.keys[i] - week_start, DAY_MINUTES)
+            run_at = (midnight + timedelta(days=day)).replace(hour=minute // 60, minute=minute % 60)
+            if run_at >= end:
+                return
+            yield run_at, self.entries[i]
+            i += 1
+
+    def iter_day(self, base):
+        midnight = base.replace(hour=0, minute=0, second=0, microsecond=0)
+        lo = base.weekday() * DAY_MINUTES
+        i = bisect_left(self.keys, lo)
+        j = bisect_left(self.keys, lo + DAY_MINUTES)
+        for k in range(i, j):
+            minute = self.keys[k] - lo
+            yield midnight.replace(hour=minute // 60, minute=minute % 60), self.entries[k]
@@ -0,0 +1,66 @@
+from app.data import repo
+from app.core.timeline import WeeklyTimeline
+
+class TimelineCache:
+    def __init__(self, conn):
+        self.conn = conn
+        self._by_set = {}
+        self._active = None
+        self._users = 0
+
+    def start(self):
+        self._users += 1
+        if self._users == 1:
+            repo.subscribe(self.on_data_changed)
+            self.preload()
+
+    def stop(self):
+        self._users = max(self._users - 1, 0)
+        if self._users == 0:
+            repo.unsubscribe(self.on_data_changed)
+
+    def clear(self):
+        self._by_set = {}
+        self._active = None
+
+    def preload(self):
+        groups = {int(s["id"]): [] for s in repo.list_schedule_sets(self.conn)}
+        for rec in repo.list_all_schedule_records(self.conn):
+            groups.setdefault(rec.set_id, []).append(rec)
+        self._by_set = {set_id: WeeklyTimeline(recs) for set_id, recs in groups.items()}
+
+    def active_set_id(self):
+        if self._active is None:
+            self._active = repo.active_set_id(self.conn)
+        return self._active
+
+    def get(self, set_id):
+        set_id = int(set_id)
+        tl = self._by_set.get(set_id)
+        if tl is None:
+            tl = self._by_set[set_id] = WeeklyTimeline(repo.list_schedule_records(self.conn, set_id))
+        return tl
+
+    def on_data_changed(self, kind, op, key):
+        if kind == "schedule":
+            for tl in self._by_set.values():
+                tl.remove(key)
+            if op != "delete":
+                rec = repo.get_schedule_record(self.conn, key)
+                if rec is not None and rec.set_id in self._by_set:
+                    self._by_set[rec.set_id].add(rec)
+        elif kind == "sound":
+            if op == "insert":
+                return
+            for tl in self._by_set.values():
+                for sid in tl.sound_schedule_ids(key):
+                    tl.remove(sid)
+            for rec in repo.list_schedule_records_by_sound(self.conn, None, key):
+                if rec.set_id in self._by_set:
+                    self._by_set[rec.set_id].add(rec)
+        elif kind == "schedule_set":
+            if op in ("delete", "reload"):
+                self._by_set.pop(int(key), None)
+        elif kind == "setting":
+            if key == "active_set_id":
+                self._active = None
@@ -0,0 +1,145 @@
+import argparse
+import heapq
+import itertools
+from datetime import datetime, timedelta
+
+from app.data import repo
+from app.core.scheduler import Scheduler, MAX_WAIT_SECONDS
+from app.core.occurrences import iter_occurrences
+from app.core.timelines import TimelineCache
+from app.core.daystate import DayState
+
+class ZoneScheduler:
+    def __init__(self, conn, player_for, clock=None):
+        self.conn = conn
+        self.player_for = player_for
+        self.clock = clock or datetime.now
+        self.running = False
+        self.timelines = TimelineCache(conn)
+        self.day = DayState(conn)
+        self.zones = {}
+        self.names = {}
+        self._heap = []
+        self._token = {}
+        self._seq = itertools.count()
+
+    def load(self):
+        self.day.reset()
+        self.zones = {}
+        self.names = {}
+        for z in repo.list_zones(self.conn):
+            if int(z["enabled"]) != 1:
+                continue
+            zid = int(z["id"])
+            sch = Scheduler(self.conn, self.player_for(str(z["output"] or "")), set_id=int(z["set_id"]), clock=self.clock, timelines=self.timelines, day=self.day)
+            sch.changed = lambda s, zid=zid: self._push(zid)
+            self.zones[zid] = sch
+            self.names[zid] = str(z["name"])
+
+    def start(self):
+        self.load()
+        self.running = True
+        for sch in self.zones.values():
+            sch.start()
+        self._rebuild()
+
+    def stop(self):
+        self.running = False
+        for sch in self.zones.values():
+            sch.stop()
+        self._heap = []
+        self._token = {}
+
+    def reload(self):
+        self.stop()
+        self.start()
+
+    def iter_occurrences(self, start, end):
+        timelines = []
+        seen = set()
+        for sch in self.zones.values():
+            if sch.set_id in seen:
+                continue
+            seen.add(sch.set_id)
+            timelines.append((sch.set_id, self.timelines.get(sch.set_id)))
+        return iter_occurrences(self.conn, timelines, start, end)
+
+    def _push(self, zid):
+        delay = self.zones[zid].next_wakeup(cap=None)
+        if delay is None:
+            return
+        seq = next(self._seq)
+        self._token[zid] = seq
+        heapq.heappush(self._heap, (self.clock() + timedelta(seconds=delay), seq, zid))
+
+    def _rebuild(self):
+        self._heap = []
+        self._token = {}
+        for zid in self.zones:
+            self._push(zid)
+
+    def _top(self):
+        while self._heap:
+            at, seq, zid = self._heap[0]
+            if self._token.get(zid) == seq:
+                return at
+            heapq.heappop(self._heap)
+        return None
+
+    @property
+    def next_event(self):
+        best = None
+        for sch in self.zones.values():
+            ev = sch.next_event
+            if ev is not None and (best is None or ev.run_at < best.run_at):
+                best = ev
+        return best
+
+    def next_wakeup(self):
+        if not self.running:
+            return None
+        at = self._top()
+        if at is None:
+            return MAX_WAIT_SECONDS
+        remain = (at - self.clock()).total_seconds()
+        return min(max(remain, 0.0), MAX_WAIT_SECONDS)
+
+    def on_wakeup(self):
+        now = self.clock()
+        while True:
+            at = self._top()
+            if at is None or at > now:
+                break
+            _, _, zid = heapq.heappop(self._heap)
+            self.zones[zid].on_wakeup()
+            self._push(zid)
+
+def main():
+    from app.data.db import connect, init_schema, read_schema
+
+    parser = argparse.ArgumentParser(prog="python -m app.core.zones", description="Manage scheduling zones")
+    parser.add_argument("--db", default=None)
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    sub.add_parser("list")
+    p_add = sub.add_parser("add")
+    p_add.add_argument("name")
+    p_add.add_argument("set_id", type=int)
+    p_add.add_argument("--output", default="")
+    p_rm = sub.add_parser("remove")
+    p_rm.add_argument("zone_id", type=int)
+    args = parser.parse_args()
+
+    conn = connect(args.db)
+    init_schema(conn, read_schema())
+
+    if args.cmd == "add":
+        print(repo.insert_zone(conn, args.name, args.set_id, args.output))
+    elif args.cmd == "remove":
+        repo.delete_zone(conn, args.zone_id)
+    else:
+        for z in repo.list_zones(conn):
+            state = "ON" if int(z["enabled"]) == 1 else "OFF"
+            print(f'{z["id"]}\t{state}\t{z["name"]}\tset={z["set_name"] or z["set_id"]}\toutput={z["output"] or "-"}')
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+BACKUP_PAGES = 64
+BACKUP_SLEEP_SECONDS = 0.005
+BACKUP_IDLE_SECONDS = 0.05
+BACKUP_KEEP = 14
+PREFIX = "tajong-"
+STAMP = "%Y%m%d-%H%M%S"
+
+def snapshot_path(dest_dir, now=None):
+    now = now or datetime.now()
+    base = f"{PREFIX}{now.strftime(STAMP)}-{now.microsecond // 1000:03d}"
+    path = Path(dest_dir) / f"{base}.db"
+    n = 0
+    while path.exists() or path.with_name(path.name + ".part").exists():
+        n += 1
+        path = Path(dest_dir) / f"{base}-{n}.db"
+    return path
+
+def _snapshot_key(path):
+    parts = Path(path).stem[len(PREFIX):].split("-")
+    try:
+        at = datetime.strptime("-".join(parts[:2]), STAMP)
+        if len(parts) > 2:
+            at = at.replace(microsecond=int(parts[2]) * 1000)
+        return at, int(parts[3]) if len(parts) > 3 else 0
+    except (ValueError, IndexError):
+        return None
+
+def snapshot_time(path):
+    key = _snapshot_key(path)
+    return None if key is None else key[0]
+
+def list_snapshots(dest_dir):
+    out = [p for p in Path(dest_dir).glob(PREFIX + "*.db") if _snapshot_key(p) is not None]
+    out.sort(key=_snapshot_key, reverse=True)
+    return out
+
+def prune_snapshots(dest_dir, keep=BACKUP_KEEP):
+    removed = 0
+    for p in list_snapshots(dest_dir)[max(int(keep), 1):]:
+        try:
+            p.unlink()
+            removed += 1
+        except OSError:
+            pass
+    return removed
+
+def _open_source(path):
+    uri = Path(str(path)).resolve().as_uri() + "?mode=ro"
+    return sqlite3.connect(uri, uri=True)
+
+def backup_to(src_path, dst_path, pages=-1, progress=None):
+    dst_path = Path(dst_path)
+    tmp = dst_path.with_name(dst_path.name + ".part")
+    if tmp.exists():
+        tmp.unlink()
+
+    src = _open_source(src_path)
+    try:
+        src.execute("BEGIN")
+        src.execute("SELECT COUNT(*) FROM sqlite_master").fetchone()
+        dst = sqlite3.connect(str(tmp))
+        try:
+            src.backup(dst, pages=pages, progress=progress)
+        finally:
+            dst.close()
+    except:
+        if tmp.exists():
+            tmp.unlink()
+        raise
+    finally:
+        src.close()
+
+    tmp.replace(dst_path)
+    return dst_path
+
+def restore_from(conn, snapshot):
+    src = sqlite3.connect(str(snapshot))
+    try:
+        src.backup(conn)
+    finally:
+        src.close()
+
+class BackupJob:
+    def __init__(self, src_path, dest_dir, busy=None, pages=BACKUP_PAGES, keep=BACKUP_KEEP):
+        self.src_path = str(src_path)
+        self.dest_dir = Path(dest_dir)
+        self.busy = busy
+        self.pages = int(pages)
+        self.keep = int(keep)
+        self.path = None
+        self.error = None
+        self.done = False
+        self.remaining = 0
+        self.total = 0
+        self.started_at = None
+        self.finished_at = None
+        self._thread = None
+
+    def start(self):
+        self.started_at = datetime.now()
+        self._thread = threading.Thread(target=self._run, name="db-backup", daemon=True)
+        self._thread.start()
+        return self
+
+    def join(self, timeout=None):
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _progress(self, status, remaining, total):
+        self.remaining = remaining
+        self.total = total
+        time.sleep(BACKUP_SLEEP_SECONDS)
+        while self.busy is not None and self.busy():
+            time.sleep(BACKUP_IDLE_SECONDS)
+
+    def _run(self):
+        try:
+            self.path = backup_to(self.src_path, snapshot_path(self.dest_dir, self.started_at), self.pages, self._progress)
+            prune_snapshots(self.dest_dir, self.keep)
+        except Exception as e:
+            self.error = e
+        finally:
+            self.finished_at = datetime.now()
+            self.done = True
@@ -1,12 +1,87 @@
 import sqlite3
-from app.core.paths import db_path
+import time
+from pathlib import Path
+from app.core.paths import db_path, resource_path
+from app.data import repo
+from app.data.profile import ProfilingConnection
+from app.data.writer import WriteBehind
+from app.data.backup import BackupJob, BACKUP_KEEP, backup_to, restore_from, snapshot_path
 
-def connect():
-    conn = sqlite3.connect(db_path())
+READ_GUARD_SECONDS = 0.5
+BACKUP_GUARD_SECONDS = 3.0
+READ_GUARD_STEPS = 2000
+
+def connect(path=None, profile=False):
+    if profile:
+        conn = sqlite3.connect(str(path or db_path()), factory=ProfilingConnection)
+    else:
+        conn = sqlite3.connect(str(path or db_path()))
     conn.row_factory = sqlite3.Row
     conn.execute("PRAGMA foreign_keys = ON;")
+    conn.execute("PRAGMA journal_mode=WAL;")
+    conn.execute("PRAGMA synchronous=NORMAL;")
+    return conn
+
+def connect_reader(path=None, profile=False):
+    uri = Path(str(path or db_path())).resolve().as_uri() + "?mode=ro"
+    if profile:
+        conn = sqlite3.connect(uri, uri=True, factory=ProfilingConnection)
+    else:
+        conn = sqlite3.connect(uri, uri=True)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA query_only = ON;")
     return conn
 
+class ConnectionManager:
+    def __init__(self, path=None, profile=False):
+        self.path = str(path or db_path())
+        self.profile = profile
+        self.conn = connect(self.path, profile)
+        self.reader = None
+        self.writer = None
+        self._deadline = None
+
+    def start(self):
+        self.reader = connect_reader(self.path, self.profile)
+        if self.profile:
+            self.reader.stats = self.conn.stats
+        self.reader.set_progress_handler(self._guard, READ_GUARD_STEPS)
+        self.writer = WriteBehind(self.path)
+        repo.attach_writer(self.conn, self.writer)
+        repo.attach_writer(self.reader, self.writer)
+
+    def set_deadline(self, at):
+        self._deadline = at
+
+    def ring_due(self, margin=READ_GUARD_SECONDS):
+        return self._deadline is not None and time.monotonic() >= self._deadline - margin
+
+    def _guard(self):
+        return self.ring_due()
+
+    def backup(self, dest_dir, keep=BACKUP_KEEP):
+        repo.flush_writes(self.conn)
+        return BackupJob(self.path, dest_dir, busy=lambda: self.ring_due(BACKUP_GUARD_SECONDS), keep=keep).start()
+
+    def restore(self, snapshot, dest_dir):
+        repo.flush_writes(self.conn)
+        backup_to(self.path, snapshot_path(dest_dir))
+        restore_from(self.conn, snapshot)
+        init_schema(self.conn, read_schema())
+        repo.reset_caches()
+
+    def close(self):
+        if self.reader is not None:
+            repo.detach_writer(self.reader)
+            self.reader.close()
+            self.reader = None
+        repo.detach_writer(self.conn)
+        self.writer = None
+
+def read_schema():
+    p = resource_path("app", "data", "schema.sql")
+    return p.read_text(encoding="utf-8")
+
 def _has_table(conn, name):
     row = conn.execute(
         "SELECT 1 FROM sqlite_master WHERE type='table' AND name=?",
@@ -24,7 +99,7 @@ def _has_column(conn, table, col):
             return True
     return False
 
-def init_schema(conn, schema_sql):
+def _migrate_baseline(conn, schema_sql):
     conn.executescript(schema_sql)
     conn.commit()
 
@@ -64,6 +139,17 @@ def init_schema(conn, schema_sql):
         conn.execute("ALTER TABLE schedules ADD COLUMN set_id INTEGER")
         conn.commit()
 
+    for col, decl in [
+        ("scheduled_at", "TEXT"),
+        ("detected_at", "TEXT"),
+        ("played_at", "TEXT"),
+        ("latency_ms", "INTEGER"),
+        ("preload_hit", "INTEGER"),
+    ]:
+        if not _has_column(conn, "logs", col):
+            conn.execute(f"ALTER TABLE logs ADD COLUMN {col} {decl}")
+            conn.commit()
+
     row = conn.execute("SELECT 1 FROM schedule_sets LIMIT 1").fetchone()
     if row is None:
         conn.execute("INSERT INTO schedule_sets(name) VALUES(?)", ("기본",))
@@ -87,3 +173,156 @@ def init_schema(conn, schema_sql):
     if sid != 0 and _has_table(conn, "schedules") and _has_column(conn, "schedules", "set_id"):
         conn.execute("UPDATE schedules SET set_id=? WHERE set_id IS NULL", (sid,))
         conn.commit()
+
+def _migrate_indexes(conn, schema_sql):
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_overrides_date_schedule_action ON overrides(date_yyyymmdd, schedule_id, action)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_logs_occurred_at ON logs(occurred_at)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_logs_result_occurred_at ON logs(result, occurred_at)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_schedules_set_id ON schedules(set_id)")
+    conn.commit()
+
+def _migrate_log_rollup(conn, schema_sql):
+    conn.executescript("""
+    CREATE TABLE IF NOT EXISTS logs_daily (
+      day TEXT NOT NULL,
+      schedule_id INTEGER NOT NULL DEFAULT 0,
+      schedule_name TEXT NOT NULL DEFAULT '',
+      sound_name TEXT NOT NULL DEFAULT '',
+      result TEXT NOT NULL,
+      count INTEGER NOT NULL DEFAULT 0,
+      latency_count INTEGER NOT NULL DEFAULT 0,
+      latency_sum INTEGER NOT NULL DEFAULT 0,
+      latency_max INTEGER,
+      preload_hits INTEGER NOT NULL DEFAULT 0,
+      first_at TEXT,
+      last_at TEXT,
+      PRIMARY KEY(day, result, schedule_id, schedule_name, sound_name)
+    );
+
+    CREATE TABLE IF NOT EXISTS logs_archive (
+      id INTEGER PRIMARY KEY,
+      occurred_at TEXT NOT NULL,
+      schedule_id INTEGER,
+      schedule_name TEXT,
+      sound_name TEXT,
+      result TEXT NOT NULL,
+      detail TEXT,
+      scheduled_at TEXT,
+      detected_at TEXT,
+      played_at TEXT,
+      latency_ms INTEGER,
+      preload_hit INTEGER
+    );
+    CREATE INDEX IF NOT EXISTS idx_logs_archive_occurred_at ON logs_archive(occurred_at);
+    """)
+    conn.commit()
+
+def _migrate_log_fts(conn, schema_sql):
+    try:
+        conn.execute("""
+        CREATE VIRTUAL TABLE IF NOT EXISTS logs_fts USING fts5(
+          schedule_name, sound_name, detail,
+          content='logs', content_rowid='id', tokenize='trigram'
+        )
+        """)
+    except sqlite3.OperationalError:
+        return
+
+    conn.executescript("""
+    CREATE TRIGGER IF NOT EXISTS logs_fts_ai AFTER INSERT ON logs BEGIN
+      INSERT INTO logs_fts(rowid, schedule_name, sound_name, detail)
+      VALUES (new.id, new.schedule_name, new.sound_name, new.detail);
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS logs_fts_ad AFTER DELETE ON logs BEGIN
+      INSERT INTO logs_fts(logs_fts, rowid, schedule_name, sound_name, detail)
+      VALUES ('delete', old.id, old.schedule_name, old.sound_name, old.detail);
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS logs_fts_au AFTER UPDATE ON logs BEGIN
+      INSERT INTO logs_fts(logs_fts, rowid, schedule_name, sound_name, detail)
+      VALUES ('delete', old.id, old.schedule_name, old.sound_name, old.detail);
+      INSERT INTO logs_fts(rowid, schedule_name, sound_name, detail)
+      VALUES (new.id, new.schedule_name, new.sound_name, new.detail);
+    END;
+
+    INSERT INTO logs_fts(logs_fts) VALUES ('rebuild');
+    """)
+    conn.commit()
+
+def _migrate_overrides_unique(conn, schema_sql):
+    conn.execute("""
+        DELETE FROM overrides
+        WHERE id NOT IN (
+          SELECT MIN(id) FROM overrides GROUP BY date_yyyymmdd, schedule_id, action
+        )
+    """)
+    conn.execute("DROP INDEX IF EXISTS idx_overrides_date_schedule_action")
+    conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS ux_overrides_date_schedule_action ON overrides(date_yyyymmdd, schedule_id, action)")
+    conn.commit()
+
+def _migrate_log_stats(conn, schema_sql):
+    conn.executescript("""
+    CREATE TABLE IF NOT EXISTS log_stats (
+      day TEXT NOT NULL,
+      schedule_id INTEGER NOT NULL DEFAULT 0,
+      schedule_name TEXT NOT NULL DEFAULT '',
+      result TEXT NOT NULL,
+      count INTEGER NOT NULL DEFAULT 0,
+      latency_count INTEGER NOT NULL DEFAULT 0,
+      latency_sum INTEGER NOT NULL DEFAULT 0,
+      latency_max INTEGER,
+      PRIMARY KEY(day, schedule_id, result, schedule_name)
+    ) WITHOUT ROWID;
+
+    CREATE INDEX IF NOT EXISTS idx_log_stats_schedule ON log_stats(schedule_id, day);
+
+    CREATE TRIGGER IF NOT EXISTS trg_log_stats_insert AFTER INSERT ON logs BEGIN
+      INSERT INTO log_stats(day, schedule_id, schedule_name, result, count, latency_count, latency_sum, latency_max)
+      VALUES(substr(new.occurred_at, 1, 10), IFNULL(new.schedule_id, 0), IFNULL(new.schedule_name, ''), new.result,
+             1, new.latency_ms IS NOT NULL, IFNULL(new.latency_ms, 0), new.latency_ms)
+      ON CONFLICT(day, schedule_id, result, schedule_name) DO UPDATE SET
+        count = count + 1,
+        latency_count = latency_count + excluded.latency_count,
+        latency_sum = latency_sum + excluded.latency_sum,
+        latency_max = MAX(IFNULL(latency_max, excluded.latency_max), IFNULL(excluded.latency_max, latency_max));
+    END;
+
+    DELETE FROM log_stats;
+    INSERT INTO log_stats(day, schedule_id, schedule_name, result, count, latency_count, latency_sum, latency_max)
+    SELECT day, schedule_id, schedule_name, result, SUM(n), SUM(lc), SUM(ls), MAX(lm)
+    FROM (
+      SELECT day, schedule_id, schedule_name, result, count AS n, latency_count AS lc, latency_sum AS ls, latency_max AS lm
+      FROM logs_daily
+      UNION ALL
+      SELECT substr(occurred_at, 1, 10), IFNULL(schedule_id, 0), IFNULL(schedule_name, ''), result,
+             1, latency_ms IS NOT NULL, IFNULL(latency_ms, 0), latency_ms
+      FROM logs
+    )
+    GROUP BY day, schedule_id, result, schedule_name;
+    """)
+    conn.commit()
+
+MIGRATIONS = [
+    _migrate_baseline,
+    _migrate_indexes,
+    _migrate_log_rollup,
+    _migrate_log_fts,
+    _migrate_overrides_unique,
+    _migrate_log_stats,
+]
+
+SCHEMA_VERSION = len(MIGRATIONS)
+
+def schema_version(conn):
+    return int(conn.execute("PRAGMA user_version").fetchone()[0])
+
+def init_schema(conn, schema_sql):
+    version = schema_version(conn)
+    if version >= SCHEMA_VERSION:
+        return
+
+    for n in range(version, SCHEMA_VERSION):
+        MIGRATIONS[n](conn, schema_sql)
+        conn.execute(f"PRAGMA user_version = {n + 1}")
+        conn.commit()
@@ -0,0 +1,20 @@
+class OverrideIndex:
+    def __init__(self, rows=()):
+        self._keys = set()
+        self._paused = set()
+        for r in rows:
+            self.add(str(r["date_yyyymmdd"]), r["schedule_id"], str(r["action"]))
+
+    def __len__(self):
+        return len(self._keys)
+
+    def add(self, date_yyyymmdd, schedule_id, action):
+        self._keys.add((date_yyyymmdd, int(schedule_id), action))
+        if action == "PAUSE_DAY":
+            self._paused.add(date_yyyymmdd)
+
+    def has(self, date_yyyymmdd, schedule_id, action):
+        return (date_yyyymmdd, int(schedule_id), action) in self._keys
+
+    def is_paused(self, date_yyyymmdd):
+        return date_yyyymmdd in self._paused
@@ -0,0 +1,169 @@
+import json
+import os
+import re
+import sqlite3
+import sys
+import threading
+import time
+
+PROFILE_ENV = "TAJONG_PROFILE"
+PROFILE_FILE = "query_profile.json"
+
+_WS = re.compile(r"\s+")
+
+def profile_target():
+    v = os.environ.get(PROFILE_ENV, "").strip()
+    if not v or v == "0":
+        return None
+    if v == "1":
+        from app.core.paths import app_data_dir
+        return str(app_data_dir() / PROFILE_FILE)
+    return v
+
+def normalize_sql(sql):
+    return _WS.sub(" ", str(sql)).strip()
+
+def _caller():
+    f = sys._getframe(2)
+    while f is not None and f.f_code.co_filename == __file__:
+        f = f.f_back
+    if f is None:
+        return "?"
+    mod = f.f_globals.get("__name__", "?")
+    return f"{mod}.{f.f_code.co_name}"
+
+class QueryStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats = {}
+        self.started_at = time.time()
+
+    def record(self, key, seconds, rows):
+        with self._lock:
+            s = self._stats.get(key)
+            if s is None:
+                s = self._stats[key] = [0, 0.0, 0.0, 0]
+            s[0] += 1
+            s[1] += seconds
+            if seconds > s[2]:
+                s[2] = seconds
+            s[3] += rows
+
+    def add_time(self, key, seconds, rows):
+        with self._lock:
+            s = self._stats.get(key)
+            if s is None:
+                return
+            s[1] += seconds
+            s[3] += rows
+
+    def reset(self):
+        with self._lock:
+            self._stats = {}
+            self.started_at = time.time()
+
+    def snapshot(self):
+        with self._lock:
+            items = list(self._stats.items())
+        out = []
+        for (caller, sql), (count, total, worst, rows) in items:
+            out.append({
+                "caller": caller,
+                "sql": sql,
+                "count": count,
+                "total_ms": round(total * 1000.0, 3),
+                "avg_ms": round(total * 1000.0 / count, 3) if count else 0.0,
+                "max_ms": round(worst * 1000.0, 3),
+                "rows": rows,
+            })
+        out.sort(key=lambda d: d["total_ms"], reverse=True)
+        return out
+
+    def dump(self, path):
+        data = {
+            "started_at": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(self.started_at)),
+            "dumped_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "statements": self.snapshot(),
+        }
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+
+class ProfilingCursor(sqlite3.Cursor):
+    _key = None
+
+    def _run(self, fn, sql, params):
+        self._key = (_caller(), normalize_sql(sql))
+        t0 = time.perf_counter()
+        try:
+            return fn(sql, params)
+        finally:
+            self.connection.stats.record(self._key, time.perf_counter() - t0, 0)
+
+    def execute(self, sql, params=()):
+        return self._run(super().execute, sql, params)
+
+    def executemany(self, sql, seq):
+        return self._run(super().executemany, sql, seq)
+
+    def _fetched(self, t0, rows):
+        if self._key is not None:
+            self.connection.stats.add_time(self._key, time.perf_counter() - t0, rows)
+
+    def fetchone(self):
+        t0 = time.perf_counter()
+        row = super().fetchone()
+        self._fetched(t0, 0 if row is None else 1)
+        return row
+
+    def fetchmany(self, size=None):
+        t0 = time.perf_counter()
+        rows = super().fetchmany(self.arraysize if size is None else size)
+        self._fetched(t0, len(rows))
+        return rows
+
+    def fetchall(self):
+        t0 = time.perf_counter()
+        rows = super().fetchall()
+        self._fetched(t0, len(rows))
+        return rows
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        t0 = time.perf_counter()
+        try:
+            row = super().__next__()
+        except StopIteration:
+            self._fetched(t0, 0)
+            raise
+        self._fetched(t0, 1)
+        return row
+
+class ProfilingConnection(sqlite3.Connection):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stats = QueryStats()
+
+    def cursor(self, factory=ProfilingCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, params=()):
+        return self.cursor().execute(sql, params)
+
+    def executemany(self, sql, seq):
+        return self.cursor().executemany(sql, seq)
+
+    def executescript(self, script):
+        t0 = time.perf_counter()
+        try:
+            return super().executescript(script)
+        finally:
+            self.stats.record((_caller(), "<script>"), time.perf_counter() - t0, 0)
+
+    def commit(self):
+        t0 = time.perf_counter()
+        try:
+            return super().commit()
+        finally:
+            self.stats.record((_caller(), "COMMIT"), time.perf_counter() - t0, 0)
@@ -0,0 +1,32 @@
+def hhmm_to_minutes(hhmm):
+    h, m = str(hhmm).split(":")
+    return int(h) * 60 + int(m)
+
+class ScheduleRecord:
+    __slots__ = ("schedule_id", "set_id", "name", "minute", "weekday_mask", "enabled",
+                 "sound_id", "sound_name", "sound_file_name", "volume")
+
+    def __init__(self, schedule_id, set_id, name, minute, weekday_mask, enabled,
+                 sound_id, sound_name, sound_file_name, volume):
+        self.schedule_id = schedule_id
+        self.set_id = set_id
+        self.name = name
+        self.minute = minute
+        self.weekday_mask = weekday_mask
+        self.enabled = enabled
+        self.sound_id = sound_id
+        self.sound_name = sound_name
+        self.sound_file_name = sound_file_name
+        self.volume = volume
+
+    @property
+    def active(self):
+        return self.enabled and self.weekday_mask != 0
+
+    @classmethod
+    def from_tuple(cls, t):
+        sid, set_id, name, hhmm, mask, enabled, sound_id, sound_name, sound_file, volume = t
+        return cls(
+            int(sid), None if set_id is None else int(set_id), str(name), hhmm_to_minutes(hhmm),
+            int(mask), int(enabled) == 1, int(sound_id), str(sound_name), str(sound_file), float(volume),
+        )
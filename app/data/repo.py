@@ -1,18 +1,68 @@
+import math
+from datetime import date, timedelta
+from app.core.paths import sound_file_path
+from app.data.overrides import OverrideIndex
+from app.data.records import ScheduleRecord
+
+_overrides_version = 0
+
+def _touch_overrides():
+    global _overrides_version
+    _overrides_version += 1
+
+def overrides_version():
+    return _overrides_version
+
+_listeners = []
+
+def subscribe(fn):
+    if fn not in _listeners:
+        _listeners.append(fn)
+
+def unsubscribe(fn):
+    if fn in _listeners:
+        _listeners.remove(fn)
+
+def _emit(kind, op, key):
+    for fn in list(_listeners):
+        fn(kind, op, key)
+
+_writers = {}
+
+def attach_writer(conn, writer):
+    _writers[conn] = writer
+
+def detach_writer(conn):
+    w = _writers.pop(conn, None)
+    if w is not None and w not in _writers.values():
+        w.close()
+
+FLUSH_TIMEOUT = 5.0
+
+def flush_writes(conn, timeout=FLUSH_TIMEOUT):
+    w = _writers.get(conn)
+    if w is not None:
+        w.flush(timeout)
+
 def list_sounds(conn):
     return conn.execute("SELECT * FROM sounds ORDER BY id DESC").fetchall()
 
 def insert_sound(conn, name, file_name, volume):
     conn.execute("INSERT INTO sounds(name, file_name, volume) VALUES(?,?,?)", (name, file_name, float(volume)))
     conn.commit()
-    return conn.execute("SELECT last_insert_rowid()").fetchone()[0]
+    sound_id = conn.execute("SELECT last_insert_rowid()").fetchone()[0]
+    _emit("sound", "insert", sound_id)
+    return sound_id
 
 def update_sound(conn, sound_id, name, volume):
     conn.execute("UPDATE sounds SET name=?, volume=? WHERE id=?", (name, float(volume), int(sound_id)))
     conn.commit()
+    _emit("sound", "update", int(sound_id))
 
 def delete_sound(conn, sound_id):
     conn.execute("DELETE FROM sounds WHERE id=?", (int(sound_id),))
     conn.commit()
+    _emit("sound", "delete", int(sound_id))
 
 def list_schedules(conn, set_id):
     return conn.execute("""
@@ -23,6 +73,42 @@ def list_schedules(conn, set_id):
         ORDER BY s.time_hhmm ASC, s.id ASC
     """, (int(set_id),)).fetchall()
 
+def get_schedule(conn, schedule_id):
+    return conn.execute("""
+        SELECT s.*, so.name AS sound_name, so.file_name AS sound_file_name, so.volume AS sound_volume
+        FROM schedules s
+        JOIN sounds so ON so.id = s.sound_id
+        WHERE s.id = ?
+    """, (int(schedule_id),)).fetchone()
+
+_RECORD_SQL = """
+    SELECT s.id, s.set_id, s.name, s.time_hhmm, s.weekday_mask, s.enabled,
+           s.sound_id, so.name, so.file_name, COALESCE(s.volume_override, so.volume)
+    FROM schedules s
+    JOIN sounds so ON so.id = s.sound_id
+"""
+
+def _records(conn, where, params):
+    cur = conn.cursor()
+    cur.row_factory = None
+    cur.execute(_RECORD_SQL + where, params)
+    return [ScheduleRecord.from_tuple(t) for t in cur.fetchall()]
+
+def list_schedule_records(conn, set_id):
+    return _records(conn, "WHERE s.set_id = ?", (int(set_id),))
+
+def list_all_schedule_records(conn):
+    return _records(conn, "WHERE s.set_id IS NOT NULL", ())
+
+def list_schedule_records_by_sound(conn, set_id, sound_id):
+    if set_id is None:
+        return _records(conn, "WHERE s.sound_id = ?", (int(sound_id),))
+    return _records(conn, "WHERE s.set_id = ? AND s.sound_id = ?", (int(set_id), int(sound_id)))
+
+def get_schedule_record(conn, schedule_id):
+    out = _records(conn, "WHERE s.id = ?", (int(schedule_id),))
+    return out[0] if out else None
+
 def insert_schedule(conn, set_id, name, weekday_mask, time_hhmm, sound_id, volume_override, enabled):
     conn.execute("""
         INSERT INTO schedules(set_id, name, weekday_mask, time_hhmm, sound_id, volume_override, enabled)
@@ -31,7 +117,9 @@ def insert_schedule(conn, set_id, name, weekday_mask, time_hhmm, sound_id, volum
           None if volume_override is None else float(volume_override),
           int(enabled)))
     conn.commit()
-    return conn.execute("SELECT last_insert_rowid()").fetchone()[0]
+    schedule_id = conn.execute("SELECT last_insert_rowid()").fetchone()[0]
+    _emit("schedule", "insert", schedule_id)
+    return schedule_id
 
 def update_schedule(conn, schedule_id, name, weekday_mask, time_hhmm, sound_id, volume_override, enabled):
     conn.execute("""
@@ -42,44 +130,52 @@ def update_schedule(conn, schedule_id, name, weekday_mask, time_hhmm, sound_id,
           None if volume_override is None else float(volume_override),
           int(enabled), int(schedule_id)))
     conn.commit()
+    _emit("schedule", "update", int(schedule_id))
 
 def delete_schedule(conn, schedule_id):
     conn.execute("DELETE FROM schedules WHERE id=?", (int(schedule_id),))
     conn.commit()
+    _emit("schedule", "delete", int(schedule_id))
 
-def insert_log(conn, occurred_at, schedule_id, schedule_name, sound_name, result, detail):
-    conn.execute("""
-        INSERT INTO logs(occurred_at, schedule_id, schedule_name, sound_name, result, detail)
-        VALUES(?,?,?,?,?,?)
-    """, (occurred_at, schedule_id, schedule_name, sound_name, result, detail))
-    conn.commit()
+_INSERT_LOG = """
+    INSERT INTO logs(occurred_at, schedule_id, schedule_name, sound_name, result, detail,
+                     scheduled_at, detected_at, played_at, latency_ms, preload_hit)
+    VALUES(?,?,?,?,?,?,?,?,?,?,?)
+"""
 
-def add_override(conn, date_yyyymmdd, schedule_id, action, note):
-    conn.execute(
-        "INSERT INTO overrides(date_yyyymmdd, schedule_id, action, note) VALUES(?,?,?,?)",
-        (date_yyyymmdd, int(schedule_id), action, note or "")
-    )
+def insert_log(conn, occurred_at, schedule_id, schedule_name, sound_name, result, detail,
+               scheduled_at=None, detected_at=None, played_at=None, latency_ms=None, preload_hit=None):
+    params = (occurred_at, schedule_id, schedule_name, sound_name, result, detail,
+              scheduled_at, detected_at, played_at, latency_ms,
+              None if preload_hit is None else int(bool(preload_hit)))
+    w = _writers.get(conn)
+    if w is not None:
+        w.submit(_INSERT_LOG, params)
+        return
+    conn.execute(_INSERT_LOG, params)
     conn.commit()
 
 def has_skip_once(conn, date_yyyymmdd, schedule_id):
-    row = conn.execute(
-        "SELECT 1 FROM overrides WHERE date_yyyymmdd=? AND schedule_id=? AND action='SKIP_ONCE' LIMIT 1",
-        (date_yyyymmdd, int(schedule_id))
-    ).fetchone()
-    return row is not None
+    return has_override(conn, date_yyyymmdd, schedule_id, "SKIP_ONCE")
+
+_INSERT_OVERRIDE = """
+    INSERT INTO overrides(date_yyyymmdd, schedule_id, action, note) VALUES(?,?,?,?)
+    ON CONFLICT(date_yyyymmdd, schedule_id, action) DO UPDATE SET
+      note = excluded.note,
+      applied_at = datetime('now')
+"""
 
 def set_pause_today(conn, date_yyyymmdd, paused):
+    flush_writes(conn)
     if paused:
-        conn.execute(
-            "INSERT INTO overrides(date_yyyymmdd, schedule_id, action, note) VALUES(?,?,?,?)",
-            (date_yyyymmdd, 0, "PAUSE_DAY", "admin")
-        )
+        conn.execute(_INSERT_OVERRIDE, (date_yyyymmdd, 0, "PAUSE_DAY", "admin"))
     else:
         conn.execute(
             "DELETE FROM overrides WHERE date_yyyymmdd=? AND action='PAUSE_DAY'",
             (date_yyyymmdd,)
         )
     conn.commit()
+    _touch_overrides()
 
 def is_pause_today(conn, date_yyyymmdd):
     row = conn.execute(
@@ -94,7 +190,28 @@ def list_logs(conn, limit_count):
         (int(limit_count),)
     ).fetchall()
 
+FTS_MIN_CHARS = 3
+
+_fts = {}
+
+def has_log_fts(conn):
+    if conn not in _fts:
+        row = conn.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name='logs_fts'").fetchone()
+        _fts[conn] = row is not None
+    return _fts[conn]
+
+def reset_caches():
+    _fts.clear()
+    _touch_overrides()
+
 def list_logs(conn, start_date, end_date, result_value, keyword, limit_count):
+    rows = list_raw_logs(conn, start_date, end_date, result_value, keyword, limit_count)
+    if len(rows) < int(limit_count):
+        rows += list_daily_logs(conn, start_date, end_date, result_value, keyword, int(limit_count) - len(rows))
+    return rows
+
+def list_raw_logs(conn, start_date, end_date, result_value, keyword, limit_count, before_id=None):
+    flush_writes(conn)
     where = []
     params = []
 
@@ -110,39 +227,260 @@ def list_logs(conn, start_date, end_date, result_value, keyword, limit_count):
         where.append("result = ?")
         params.append(result_value)
 
-    if keyword:
+    sql = "SELECT * FROM logs"
+    order = "id"
+    if keyword and len(keyword) >= FTS_MIN_CHARS and has_log_fts(conn):
+        sql = "SELECT logs.* FROM logs_fts JOIN logs ON logs.id = logs_fts.rowid"
+        order = "logs_fts.rowid"
+        where.append("logs_fts MATCH ?")
+        params.append('"' + keyword.replace('"', '""') + '"')
+    elif keyword:
         where.append("(schedule_name LIKE ? OR sound_name LIKE ? OR detail LIKE ?)")
         k = "%" + keyword + "%"
         params.extend([k, k, k])
 
-    sql = "SELECT * FROM logs"
+    if before_id is not None:
+        where.append(f"{order} < ?")
+        params.append(int(before_id))
+
     if where:
         sql += " WHERE " + " AND ".join(where)
-    sql += " ORDER BY id DESC LIMIT ?"
+    sql += f" ORDER BY {order} DESC LIMIT ?"
     params.append(int(limit_count))
 
     return conn.execute(sql, tuple(params)).fetchall()
 
-def add_override(conn, date_yyyymmdd, schedule_id, action, note):
-    conn.execute(
-        "INSERT INTO overrides(date_yyyymmdd, schedule_id, action, note) VALUES(?,?,?,?)",
-        (date_yyyymmdd, int(schedule_id), action, note or "")
-    )
+def list_daily_logs(conn, start_date, end_date, result_value, keyword, limit_count, before=None):
+    where = []
+    params = []
+
+    if start_date:
+        where.append("day >= ?")
+        params.append(start_date)
+
+    if end_date:
+        where.append("day <= ?")
+        params.append(end_date)
+
+    if result_value and result_value != "ALL":
+        where.append("result = ?")
+        params.append(result_value)
+
+    if keyword:
+        where.append("(schedule_name LIKE ? OR sound_name LIKE ?)")
+        k = "%" + keyword + "%"
+        params.extend([k, k])
+
+    if before is not None:
+        where.append("(day < ? OR (day = ? AND rowid < ?))")
+        params.extend([before[0], before[0], int(before[1])])
+
+    sql = """
+        SELECT NULL AS id, rowid AS daily_id, day AS occurred_at, NULLIF(schedule_id, 0) AS schedule_id,
+               schedule_name, sound_name, result,
+               count || '회 (일별 집계' ||
+               CASE WHEN latency_count > 0
+                    THEN ', 평균 지연 ' || (latency_sum / latency_count) || 'ms, 최대 ' || latency_max || 'ms'
+                    ELSE '' END || ')' AS detail
+        FROM logs_daily
+    """
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    sql += " ORDER BY day DESC, rowid DESC LIMIT ?"
+    params.append(int(limit_count))
+
+    return conn.execute(sql, tuple(params)).fetchall()
+
+LOG_RETENTION_DAYS = 180
+
+def rollup_logs(conn, before_date, archive=True):
+    flush_writes(conn)
+    cutoff = before_date + " 00:00:00"
+
+    conn.execute("""
+        INSERT INTO logs_daily(day, schedule_id, schedule_name, sound_name, result, count,
+                               latency_count, latency_sum, latency_max, preload_hits, first_at, last_at)
+        SELECT substr(occurred_at, 1, 10), IFNULL(schedule_id, 0), IFNULL(schedule_name, ''),
+               IFNULL(sound_name, ''), result, COUNT(*), COUNT(latency_ms), IFNULL(SUM(latency_ms), 0),
+               MAX(latency_ms), IFNULL(SUM(preload_hit), 0), MIN(occurred_at), MAX(occurred_at)
+        FROM logs
+        WHERE occurred_at < ?
+        GROUP BY 1, 2, 3, 4, 5
+        ON CONFLICT(day, result, schedule_id, schedule_name, sound_name) DO UPDATE SET
+          count = count + excluded.count,
+          latency_count = latency_count + excluded.latency_count,
+          latency_sum = latency_sum + excluded.latency_sum,
+          latency_max = MAX(IFNULL(latency_max, excluded.latency_max), IFNULL(excluded.latency_max, latency_max)),
+          preload_hits = preload_hits + excluded.preload_hits,
+          first_at = MIN(first_at, excluded.first_at),
+          last_at = MAX(last_at, excluded.last_at)
+    """, (cutoff,))
+
+    if archive:
+        conn.execute("""
+            INSERT OR IGNORE INTO logs_archive(id, occurred_at, schedule_id, schedule_name, sound_name, result, detail,
+                                               scheduled_at, detected_at, played_at, latency_ms, preload_hit)
+            SELECT id, occurred_at, schedule_id, schedule_name, sound_name, result, detail,
+                   scheduled_at, detected_at, played_at, latency_ms, preload_hit
+            FROM logs WHERE occurred_at < ?
+        """, (cutoff,))
+
+    cur = conn.execute("DELETE FROM logs WHERE occurred_at < ?", (cutoff,))
     conn.commit()
+    return cur.rowcount
+
+def apply_log_retention(conn, today=None):
+    try:
+        days = int(get_setting(conn, "log_retention_days", LOG_RETENTION_DAYS))
+    except:
+        days = LOG_RETENTION_DAYS
+    if days <= 0:
+        return 0
+
+    archive = get_setting(conn, "log_archive", "1") == "1"
+    before = (today or date.today()) - timedelta(days=days)
+    return rollup_logs(conn, before.strftime("%Y-%m-%d"), archive)
+
+def _percentile(values, q):
+    return values[max(0, math.ceil(q * len(values)) - 1)]
+
+def latency_by_day(conn, start_date, end_date):
+    flush_writes(conn)
+    where = ["result = 'PLAYED'", "latency_ms IS NOT NULL"]
+    params = []
+    if start_date:
+        where.append("occurred_at >= ?")
+        params.append(start_date + " 00:00:00")
+    if end_date:
+        where.append("occurred_at <= ?")
+        params.append(end_date + " 23:59:59")
+
+    rows = conn.execute(
+        "SELECT substr(occurred_at, 1, 10) AS day, latency_ms, preload_hit FROM logs WHERE "
+        + " AND ".join(where) + " ORDER BY day DESC, latency_ms ASC",
+        tuple(params)
+    ).fetchall()
+
+    out = []
+    day = None
+    values = []
+    hits = 0
+    for r in rows + [None]:
+        if r is None or r["day"] != day:
+            if values:
+                out.append({
+                    "day": day,
+                    "count": len(values),
+                    "p50": _percentile(values, 0.50),
+                    "p95": _percentile(values, 0.95),
+                    "p99": _percentile(values, 0.99),
+                    "preload_hits": hits,
+                })
+            if r is None:
+                break
+            day = r["day"]
+            values = []
+            hits = 0
+        values.append(int(r["latency_ms"]))
+        if r["preload_hit"]:
+            hits += 1
+    return out
+
+def add_override(conn, date_yyyymmdd, schedule_id, action, note):
+    params = (date_yyyymmdd, int(schedule_id), action, note or "")
+    w = _writers.get(conn)
+    if w is not None:
+        w.submit(_INSERT_OVERRIDE, params, override=params[:3])
+    else:
+        conn.execute(_INSERT_OVERRIDE, params)
+        conn.commit()
+    _touch_overrides()
 
 def has_override(conn, date_yyyymmdd, schedule_id, action):
+    w = _writers.get(conn)
+    if w is not None and (date_yyyymmdd, int(schedule_id), action) in w.pending_overrides():
+        return True
     row = conn.execute(
         "SELECT 1 FROM overrides WHERE date_yyyymmdd=? AND schedule_id=? AND action=? LIMIT 1",
         (date_yyyymmdd, int(schedule_id), action)
     ).fetchone()
     return row is not None
 
-def clear_transient_overrides(conn, date_yyyymmdd):
-    conn.execute(
-        "DELETE FROM overrides WHERE date_yyyymmdd=? AND action IN ('SKIP_ONCE','FIRED_ONCE')",
-        (date_yyyymmdd,)
+def load_overrides(conn, start_date, end_date):
+    w = _writers.get(conn)
+    pending = w.pending_overrides() if w is not None else []
+    rows = conn.execute(
+        "SELECT date_yyyymmdd, schedule_id, action FROM overrides WHERE date_yyyymmdd BETWEEN ? AND ?",
+        (start_date, end_date)
+    ).fetchall()
+    index = OverrideIndex(rows)
+    for d, sid, action in pending:
+        if start_date <= d <= end_date:
+            index.add(d, sid, action)
+    return index
+
+def clear_transient_overrides(conn, date_yyyymmdd, schedule_id=None):
+    flush_writes(conn)
+    sql = "DELETE FROM overrides WHERE date_yyyymmdd=? AND action IN ('SKIP_ONCE','FIRED_ONCE')"
+    params = [date_yyyymmdd]
+    if schedule_id is not None:
+        sql += " AND schedule_id=?"
+        params.append(int(schedule_id))
+    cur = conn.execute(sql, tuple(params))
+    conn.commit()
+    if cur.rowcount:
+        _touch_overrides()
+
+def compact_overrides(conn, before_date):
+    flush_writes(conn)
+    cur = conn.execute(
+        "DELETE FROM overrides WHERE date_yyyymmdd < ? AND action IN ('SKIP_ONCE','FIRED_ONCE')",
+        (before_date,)
     )
     conn.commit()
+    if cur.rowcount:
+        _touch_overrides()
+    return cur.rowcount
+
+def import_schedules(conn, set_id, rows, replace=False):
+    sound_ids = {}
+    for so in conn.execute("SELECT id, file_name FROM sounds ORDER BY id DESC").fetchall():
+        sound_ids[str(so["file_name"])] = int(so["id"])
+
+    for n, r in enumerate(rows, start=1):
+        f = r["sound_file_name"]
+        if f not in sound_ids and not sound_file_path(f).exists():
+            raise ValueError(f"{n}번째 항목의 종소리 파일이 없습니다: {f}")
+
+    try:
+        params = []
+        for r in rows:
+            f = r["sound_file_name"]
+            if f not in sound_ids:
+                cur = conn.execute(
+                    "INSERT INTO sounds(name, file_name, volume) VALUES(?,?,?)",
+                    (r["sound_name"] or f, f, float(r["sound_volume"]))
+                )
+                sound_ids[f] = cur.lastrowid
+            params.append((
+                int(set_id), r["name"], int(r["weekday_mask"]), r["time_hhmm"], sound_ids[f],
+                None if r["volume_override"] is None else float(r["volume_override"]),
+                int(r["enabled"]),
+            ))
+
+        if replace:
+            conn.execute("DELETE FROM schedules WHERE set_id=?", (int(set_id),))
+        conn.executemany("""
+            INSERT INTO schedules(set_id, name, weekday_mask, time_hhmm, sound_id, volume_override, enabled)
+            VALUES(?,?,?,?,?,?,?)
+        """, params)
+        conn.commit()
+    except:
+        conn.rollback()
+        raise
+
+    _emit("schedule_set", "reload", int(set_id))
+    return len(params)
 
 def list_schedule_sets(conn):
     return conn.execute("SELECT * FROM schedule_sets ORDER BY id ASC").fetchall()
@@ -150,16 +488,47 @@ def list_schedule_sets(conn):
 def insert_schedule_set(conn, name):
     conn.execute("INSERT INTO schedule_sets(name) VALUES(?)", (name,))
     conn.commit()
-    return conn.execute("SELECT last_insert_rowid()").fetchone()[0]
+    set_id = conn.execute("SELECT last_insert_rowid()").fetchone()[0]
+    _emit("schedule_set", "insert", set_id)
+    return set_id
 
 def rename_schedule_set(conn, set_id, name):
     conn.execute("UPDATE schedule_sets SET name=? WHERE id=?", (name, int(set_id)))
     conn.commit()
+    _emit("schedule_set", "update", int(set_id))
 
 def delete_schedule_set(conn, set_id):
     conn.execute("DELETE FROM schedules WHERE set_id=?", (int(set_id),))
     conn.execute("DELETE FROM schedule_sets WHERE id=?", (int(set_id),))
     conn.commit()
+    _emit("schedule_set", "delete", int(set_id))
+
+def list_zones(conn):
+    return conn.execute("""
+        SELECT z.*, ss.name AS set_name
+        FROM zones z
+        LEFT JOIN schedule_sets ss ON ss.id = z.set_id
+        ORDER BY z.id ASC
+    """).fetchall()
+
+def insert_zone(conn, name, set_id, output, enabled=1):
+    conn.execute(
+        "INSERT INTO zones(name, set_id, output, enabled) VALUES(?,?,?,?)",
+        (name, int(set_id), output or "", int(enabled))
+    )
+    conn.commit()
+    return conn.execute("SELECT last_insert_rowid()").fetchone()[0]
+
+def update_zone(conn, zone_id, name, set_id, output, enabled):
+    conn.execute(
+        "UPDATE zones SET name=?, set_id=?, output=?, enabled=? WHERE id=?",
+        (name, int(set_id), output or "", int(enabled), int(zone_id))
+    )
+    conn.commit()
+
+def delete_zone(conn, zone_id):
+    conn.execute("DELETE FROM zones WHERE id=?", (int(zone_id),))
+    conn.commit()
 
 def get_setting(conn, key, default_value=""):
     row = conn.execute("SELECT value FROM settings WHERE key=?", (key,)).fetchone()
@@ -168,6 +537,7 @@ def get_setting(conn, key, default_value=""):
 def set_setting(conn, key, value):
     conn.execute("INSERT OR REPLACE INTO settings(key,value) VALUES(?,?)", (key, str(value)))
     conn.commit()
+    _emit("setting", "update", key)
 
 def active_set_id(conn):
     row = conn.execute(
@@ -0,0 +1,62 @@
+from app.data import repo
+
+ROLLING_DAYS = 7
+
+def _range(start_date, end_date):
+    where = []
+    params = []
+    if start_date:
+        where.append("day >= ?")
+        params.append(start_date)
+    if end_date:
+        where.append("day <= ?")
+        params.append(end_date)
+    return (" WHERE " + " AND ".join(where)) if where else "", params
+
+_COUNTS = """
+    SUM(count) AS total,
+    SUM(CASE WHEN result = 'PLAYED' THEN count ELSE 0 END) AS played,
+    SUM(CASE WHEN result = 'MISSED' THEN count ELSE 0 END) AS missed,
+    SUM(CASE WHEN result = 'FAILED' THEN count ELSE 0 END) AS failed,
+    SUM(CASE WHEN result = 'SKIPPED' THEN count ELSE 0 END) AS skipped,
+    SUM(CASE WHEN result = 'PLAYED' THEN latency_count ELSE 0 END) AS latency_count,
+    SUM(CASE WHEN result = 'PLAYED' THEN latency_sum ELSE 0 END) AS latency_sum,
+    MAX(CASE WHEN result = 'PLAYED' THEN latency_max END) AS latency_max
+"""
+
+def by_day(conn, start_date, end_date):
+    repo.flush_writes(conn)
+    where, params = _range(start_date, end_date)
+    return conn.execute(f"""
+        WITH d AS (
+          SELECT day, {_COUNTS}
+          FROM log_stats{where}
+          GROUP BY day
+        )
+        SELECT day, total, played, missed, failed, skipped, latency_max,
+               CASE WHEN latency_count > 0 THEN latency_sum / latency_count END AS latency_avg,
+               100.0 * SUM(missed + failed) OVER w / MAX(SUM(total) OVER w, 1) AS rolling_fail_pct
+        FROM d
+        WINDOW w AS (ORDER BY julianday(day) RANGE BETWEEN {ROLLING_DAYS - 1} PRECEDING AND CURRENT ROW)
+        ORDER BY day DESC
+    """, tuple(params)).fetchall()
+
+def by_schedule(conn, start_date, end_date):
+    repo.flush_writes(conn)
+    where, params = _range(start_date, end_date)
+    return conn.execute(f"""
+        WITH s AS (
+          SELECT schedule_id, {_COUNTS}
+          FROM log_stats{where}
+          GROUP BY schedule_id
+        )
+        SELECT schedule_id,
+               (SELECT schedule_name FROM log_stats x WHERE x.schedule_id = s.schedule_id
+                ORDER BY day DESC LIMIT 1) AS schedule_name,
+               total, played, missed, failed, skipped, latency_max,
+               CASE WHEN latency_count > 0 THEN latency_sum / latency_count END AS latency_avg,
+               100.0 * (missed + failed) / total AS fail_pct,
+               RANK() OVER (ORDER BY missed + failed DESC) AS fail_rank
+        FROM s
+        ORDER BY fail_rank, latency_avg DESC, schedule_name
+    """, tuple(params)).fetchall()
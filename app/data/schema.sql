@@ -29,7 +29,12 @@ CREATE TABLE IF NOT EXISTS logs (
   schedule_name TEXT,
   sound_name TEXT,
   result TEXT NOT NULL,
-  detail TEXT
+  detail TEXT,
+  scheduled_at TEXT,
+  detected_at TEXT,
+  played_at TEXT,
+  latency_ms INTEGER,
+  preload_hit INTEGER
 );
 
 CREATE TABLE IF NOT EXISTS overrides (
@@ -45,4 +50,13 @@ CREATE TABLE IF NOT EXISTS schedule_sets (
   id INTEGER PRIMARY KEY AUTOINCREMENT,
   name TEXT NOT NULL UNIQUE,
   created_at TEXT NOT NULL DEFAULT (datetime('now'))
+);
+
+CREATE TABLE IF NOT EXISTS zones (
+  id INTEGER PRIMARY KEY AUTOINCREMENT,
+  name TEXT NOT NULL UNIQUE,
+  set_id INTEGER NOT NULL,
+  output TEXT NOT NULL DEFAULT '',
+  enabled INTEGER NOT NULL DEFAULT 1,
+  created_at TEXT NOT NULL DEFAULT (datetime('now'))
 );
\ No newline at end of file
@@ -0,0 +1,126 @@
+import sqlite3
+import sys
+import threading
+import time
+
+GROUP_DELAY_SECONDS = 0.25
+MAX_BATCH = 500
+RETRY_SECONDS = 1.0
+MAX_ATTEMPTS = 3
+
+class WriteBehind:
+    def __init__(self, path, delay=GROUP_DELAY_SECONDS, max_batch=MAX_BATCH):
+        self.path = str(path)
+        self.delay = float(delay)
+        self.max_batch = int(max_batch)
+        self.commits = 0
+        self.written = 0
+        self.dropped = []
+        self._cond = threading.Condition()
+        self._queue = []
+        self._overrides = []
+        self._busy = False
+        self._flush_wanted = False
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="write-behind", daemon=True)
+        self._thread.start()
+
+    def submit(self, sql, params, override=None):
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("write-behind queue is closed")
+            self._queue.append([sql, params, override, 0])
+            if override is not None:
+                self._overrides.append(override)
+            self._cond.notify_all()
+
+    def pending_overrides(self):
+        with self._cond:
+            return list(self._overrides)
+
+    def flush(self, timeout=None):
+        with self._cond:
+            self._flush_wanted = True
+            self._cond.notify_all()
+            return self._cond.wait_for(lambda: not self._queue and not self._busy, timeout)
+
+    def close(self, timeout=10.0):
+        self.flush(timeout)
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join(timeout)
+
+    def _take(self):
+        with self._cond:
+            while not self._queue and not self._closed:
+                self._cond.wait()
+            if not self._queue:
+                return None
+
+            deadline = time.monotonic() + self.delay
+            while len(self._queue) < self.max_batch and not self._flush_wanted and not self._closed:
+                remain = deadline - time.monotonic()
+                if remain <= 0:
+                    break
+                self._cond.wait(remain)
+
+            batch = self._queue[:self.max_batch]
+            del self._queue[:len(batch)]
+            self._busy = True
+            if not self._queue:
+                self._flush_wanted = False
+            return batch
+
+    def _run(self):
+        conn = sqlite3.connect(self.path, timeout=30.0)
+        conn.execute("PRAGMA journal_mode=WAL;")
+        conn.execute("PRAGMA synchronous=NORMAL;")
+
+        while True:
+            batch = self._take()
+            if batch is None:
+                break
+
+            done, retry, dropped = self._apply(conn, batch)
+
+            with self._cond:
+                for item in done + dropped:
+                    if item[2] is not None:
+                        self._overrides.remove(item[2])
+                if retry and not self._closed:
+                    self._queue[:0] = retry
+                self.dropped.extend(dropped)
+                self.commits += 1
+                self.written += len(done)
+                self._busy = False
+                self._cond.notify_all()
+            if retry:
+                time.sleep(RETRY_SECONDS)
+
+        conn.close()
+
+    def _apply(self, conn, batch):
+        try:
+            with conn:
+                for sql, params, _, _ in batch:
+                    conn.execute(sql, params)
+            return batch, [], []
+        except Exception:
+            pass
+
+        done, retry, dropped = [], [], []
+        for item in batch:
+            try:
+                with conn:
+                    conn.execute(item[0], item[1])
+                done.append(item)
+            except Exception as e:
+                item[3] += 1
+                if item[3] >= MAX_ATTEMPTS:
+                    print(f"write-behind: dropping statement after {item[3]} attempts ({e}): {item[1]}", file=sys.stderr)
+                    dropped.append(item)
+                else:
+                    print(f"write-behind: statement failed ({e}), retrying", file=sys.stderr)
+                    retry.append(item)
+        return done, retry, dropped
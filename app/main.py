@@ -2,16 +2,13 @@ import sys
 from PyQt6.QtWidgets import QApplication, QMessageBox
 from PyQt6.QtGui import QFont
 
-from app.data.db import connect, init_schema
+from app.data.db import ConnectionManager, init_schema, read_schema
+from app.data.profile import profile_target
 from app.core.bootstrap import seed_if_empty
-from app.core.paths import resource_path, app_data_dir, APP_NAME
+from app.core.paths import app_data_dir, APP_NAME
 from app.core.single_instance import acquire
 from app.ui.main_window import MainWindow
 
-def read_schema():
-    p = resource_path("app", "data", "schema.sql")
-    return p.read_text(encoding="utf-8")
-
 def main():
     app = QApplication(sys.argv)
 
@@ -24,11 +21,13 @@ def main():
     font.setPointSize(10)
     app.setFont(font)
 
-    conn = connect()
+    db = ConnectionManager(profile=profile_target() is not None)
+    conn = db.conn
     init_schema(conn, read_schema())
     seed_if_empty(conn)
+    db.start()
 
-    win = MainWindow(conn, app)
+    win = MainWindow(db, app)
     win.resize(1100, 650)
     win.show()
     sys.exit(app.exec())
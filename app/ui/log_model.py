@@ -0,0 +1,156 @@
+import sqlite3
+from bisect import bisect_right
+from collections import OrderedDict
+
+from PyQt6.QtCore import Qt, QAbstractTableModel, QModelIndex, QTimer
+
+from app.data import repo
+
+PAGE_SIZE = 200
+MAX_PAGES = 10
+RETRY_MS = 1000
+
+COLUMNS = [
+    ("id", "ID"),
+    ("occurred_at", "시간"),
+    ("result", "결과"),
+    ("schedule_name", "이벤트"),
+    ("sound_name", "종소리"),
+    ("detail", "상세"),
+]
+
+class LogTableModel(QAbstractTableModel):
+    def __init__(self, conn, parent=None):
+        super().__init__(parent)
+        self.conn = conn
+        self._pages = []
+        self._starts = []
+        self._count = 0
+        self._loaded = OrderedDict()
+        self._filters = ("", "", "ALL", "")
+        self._phase = "raw"
+        self._cursor = None
+        self._done = True
+
+    def set_filters(self, start_date, end_date, result_value, keyword):
+        self.beginResetModel()
+        self._filters = (start_date, end_date, result_value, keyword)
+        self._pages = []
+        self._starts = []
+        self._count = 0
+        self._loaded = OrderedDict()
+        self._phase = "raw"
+        self._cursor = None
+        self._done = False
+        self.endResetModel()
+
+    def reload(self):
+        self.set_filters(*self._filters)
+
+    def log_id(self, row):
+        values = self._row(row)
+        return None if values is None else values[0]
+
+    def _row(self, row):
+        if row < 0 or row >= self._count:
+            return None
+        n = bisect_right(self._starts, row) - 1
+        rows = self._loaded.get(n)
+        if rows is None:
+            (phase, cursor), count = self._pages[n]
+            try:
+                rows = self._store(n, self._fetch(phase, cursor, count))
+            except sqlite3.OperationalError:
+                return None
+        else:
+            self._loaded.move_to_end(n)
+        i = row - self._starts[n]
+        return rows[i] if i < len(rows) else None
+
+    def _store(self, n, page):
+        rows = self._loaded[n] = [tuple(r[k] for k, _ in COLUMNS) for r in page]
+        while len(self._loaded) > MAX_PAGES:
+            self._loaded.popitem(last=False)
+        return rows
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return self._count
+
+    def columnCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(COLUMNS)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or role != Qt.ItemDataRole.DisplayRole:
+            return None
+        values = self._row(index.row())
+        if values is None:
+            return None
+        v = values[index.column()]
+        return "" if v is None else str(v)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role != Qt.ItemDataRole.DisplayRole:
+            return None
+        if orientation == Qt.Orientation.Horizontal:
+            return COLUMNS[section][1]
+        return str(section + 1)
+
+    def canFetchMore(self, parent=QModelIndex()):
+        if parent.isValid():
+            return False
+        return not self._done
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid() or self._done:
+            return
+
+        state = (self._phase, self._cursor, self._done)
+        try:
+            start, page = self._next_page()
+        except sqlite3.OperationalError:
+            self._phase, self._cursor, self._done = state
+            QTimer.singleShot(RETRY_MS, self._retry)
+            return
+        if not page:
+            return
+
+        n = self._count
+        self.beginInsertRows(QModelIndex(), n, n + len(page) - 1)
+        self._pages.append((start, len(page)))
+        self._starts.append(n)
+        self._store(len(self._pages) - 1, page)
+        self._count += len(page)
+        self.endInsertRows()
+
+    def _retry(self):
+        if self.canFetchMore():
+            self.fetchMore()
+
+    def _fetch(self, phase, cursor, limit):
+        if phase == "raw":
+            return repo.list_raw_logs(self.conn, *self._filters, limit, before_id=cursor)
+        return repo.list_daily_logs(self.conn, *self._filters, limit, before=cursor)
+
+    def _next_page(self):
+        if self._phase == "raw":
+            page = self._fetch("raw", self._cursor, PAGE_SIZE)
+            start = ("raw", page[0]["id"] + 1) if page else None
+            if page:
+                self._cursor = page[-1]["id"]
+            if len(page) < PAGE_SIZE:
+                self._phase = "daily"
+                self._cursor = None
+            if page:
+                return start, page
+
+        start = ("daily", self._cursor)
+        page = self._fetch("daily", self._cursor, PAGE_SIZE)
+        if page:
+            self._cursor = (page[-1]["occurred_at"], page[-1]["daily_id"])
+        if len(page) < PAGE_SIZE:
+            self._done = True
+        return start, page
@@ -1,31 +1,46 @@
 from PyQt6.QtWidgets import (
     QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton,
-    QTabWidget, QTableWidget, QTableWidgetItem, QMessageBox, QComboBox,
+    QTabWidget, QTableWidget, QTableWidgetItem, QTableView, QMessageBox, QComboBox,
     QCheckBox, QLineEdit, QDateEdit, QSpinBox, QFrame, QToolBar, QDialog,
-    QGroupBox, QHeaderView, QAbstractItemView, QSystemTrayIcon, QMenu, QInputDialog
+    QGroupBox, QHeaderView, QAbstractItemView, QSystemTrayIcon, QMenu, QInputDialog, QFileDialog
 )
 from PyQt6.QtCore import QTimer, QDate, Qt
 from PyQt6.QtGui import QIcon, QAction
 
 from pathlib import Path
+import math
 import shutil
+import sqlite3
+import time
 from datetime import datetime
 
-from app.data import repo
-from app.core.paths import sound_file_path, sounds_dir, asset_path
+from app.data import repo, reports
+from app.core.paths import sound_file_path, sounds_dir, asset_path, app_data_dir, backups_dir
+from app.data.backup import BACKUP_KEEP, list_snapshots, snapshot_time
+from app.data.profile import profile_target, PROFILE_FILE
 from app.ui.dialogs import AddSoundDialog, ScheduleDialog, EditSoundDialog
-from app.core.player import SoundPlayer
+from app.ui.log_model import LogTableModel
+from app.core.player import SoundPlayer, SOUND_CACHE_MB
+from app.core.maintenance import DailyMaintenance
 from app.core.scheduler import Scheduler
+from app.core.setio import import_set, export_set
 from app.core.startup import is_startup_enabled, enable_startup, disable_startup
 
 
+BACKUP_CHECK_MS = 60 * 60 * 1000
+BACKUP_FIRST_CHECK_MS = 60 * 1000
+BACKUP_POLL_MS = 500
+
 class MainWindow(QMainWindow):
-    def __init__(self, conn, app):
+    def __init__(self, db, app):
         super().__init__()
-        self.conn = conn
+        self.db = db
+        self.conn = db.conn
+        self.reader = db.reader or db.conn
         self.app = app
-        self.player = SoundPlayer()
+        self.player = SoundPlayer(self._sound_cache_mb() * 1024 * 1024)
         self.scheduler = Scheduler(self.conn, self.player)
+        self.maintenance = DailyMaintenance(self.conn)
 
         self.setWindowTitle("마고수학학원 타종 프로그램 - 구현민 개발")
 
@@ -61,13 +76,32 @@ class MainWindow(QMainWindow):
         self._init_tray()
         self._init_window_icon()
 
+        self.timer = None
+        self.wake_timer = None
+        self.clock_timer = None
+        if repo.get_setting(self.conn, "tick_mode", "deadline") == "poll":
+            self.timer = QTimer(self)
+            self.timer.setInterval(250)
+            self.timer.timeout.connect(self.on_tick)
+        else:
+            self.wake_timer = QTimer(self)
+            self.wake_timer.setSingleShot(True)
+            self.wake_timer.setTimerType(Qt.TimerType.PreciseTimer)
+            self.wake_timer.timeout.connect(self.on_wakeup)
+
+            self.clock_timer = QTimer(self)
+            self.clock_timer.setInterval(1000)
+            self.clock_timer.timeout.connect(self.refresh_clock)
+
+        self.maintenance.run_if_due()
         self.refresh_all()
         self.scheduler.start()
+        repo.subscribe(self.on_data_changed)
+        self._arm_wakeup()
+        self.refresh_clock()
 
-        self.timer = QTimer(self)
-        self.timer.setInterval(250)
-        self.timer.timeout.connect(self.on_tick)
-        self.timer.start()
+        if self.timer is not None:
+            self.timer.start()
 
         self.setMinimumSize(980, 720)
 
@@ -376,6 +410,7 @@ class MainWindow(QMainWindow):
     def on_toggle_pause_today(self):
         today = self._today_str()
         repo.set_pause_today(self.conn, today, self.chk_pause_today.isChecked())
+        self._arm_wakeup()
 
     def _build_sounds(self):
         layout = QVBoxLayout(self.tab_sounds)
@@ -458,9 +493,16 @@ class MainWindow(QMainWindow):
         btn_set_rename.setObjectName("Ghost")
         btn_set_del.setObjectName("Ghost")
 
+        btn_set_import = QPushButton("가져오기")
+        btn_set_export = QPushButton("내보내기")
+        btn_set_import.setObjectName("Ghost")
+        btn_set_export.setObjectName("Ghost")
+
         bar_layout.addWidget(btn_set_add)
         bar_layout.addWidget(btn_set_rename)
         bar_layout.addWidget(btn_set_del)
+        bar_layout.addWidget(btn_set_import)
+        bar_layout.addWidget(btn_set_export)
 
         bar_layout.addWidget(QLabel("요일"))
         self.sch_day_filter = QComboBox()
@@ -509,6 +551,8 @@ class MainWindow(QMainWindow):
         btn_set_add.clicked.connect(self.on_add_schedule_set)
         btn_set_rename.clicked.connect(self.on_rename_schedule_set)
         btn_set_del.clicked.connect(self.on_delete_schedule_set)
+        btn_set_import.clicked.connect(self.on_import_schedule_set)
+        btn_set_export.clicked.connect(self.on_export_schedule_set)
 
         self.sch_set_combo.currentIndexChanged.connect(self.on_change_schedule_set)
         self.schedule_table.cellDoubleClicked.connect(lambda r, c: self.on_edit_schedule())
@@ -539,6 +583,7 @@ class MainWindow(QMainWindow):
         self.log_result.addItem("전체", "ALL")
         self.log_result.addItem("PLAYED", "PLAYED")
         self.log_result.addItem("SKIPPED", "SKIPPED")
+        self.log_result.addItem("MISSED", "MISSED")
         self.log_result.addItem("FAILED", "FAILED")
         top.addWidget(self.log_result)
 
@@ -546,10 +591,6 @@ class MainWindow(QMainWindow):
         self.log_keyword.setPlaceholderText("검색: 이벤트/종소리/상세")
         top.addWidget(self.log_keyword)
 
-        self.log_limit = QSpinBox()
-        self.log_limit.setRange(50, 5000)
-        self.log_limit.setValue(500)
-        top.addWidget(self.log_limit)
 
         self.btn_log_refresh = QPushButton("새로고침")
         self.btn_log_refresh.setObjectName("Ghost")
@@ -557,23 +598,40 @@ class MainWindow(QMainWindow):
 
         layout.addLayout(top)
 
-        self.log_table = QTableWidget()
-        self.log_table.setColumnCount(6)
-        self.log_table.setHorizontalHeaderLabels(["ID", "시간", "결과", "이벤트", "종소리", "상세"])
+        self.log_model = LogTableModel(self.reader, self)
+        self.log_table = QTableView()
+        self.log_table.setModel(self.log_model)
         self.log_table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
         self.log_table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
         self.log_table.setAlternatingRowColors(True)
         self.log_table.horizontalHeader().setStretchLastSection(True)
-        self.log_table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.ResizeToContents)
-        self.log_table.cellDoubleClicked.connect(self.on_log_detail)
+        self.log_table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Interactive)
+        self.log_table.horizontalHeader().setDefaultSectionSize(150)
+        self.log_table.doubleClicked.connect(lambda index: self.on_log_detail(index.row(), index.column()))
         self.log_table.setColumnHidden(0, True)
 
-        layout.addWidget(self.log_table)
+        layout.addWidget(self.log_table, 3)
+
+        lbl_latency = QLabel("타종 통계 (지연: 예정 시각 → 재생 시작)")
+        lbl_latency.setObjectName("Muted")
+        layout.addWidget(lbl_latency)
+
+        self.report_tabs = QTabWidget()
+        self.latency_table = self._report_table(["날짜", "타종", "p50(ms)", "p95(ms)", "p99(ms)", "프리로드"])
+        self.report_tabs.addTab(self.latency_table, "일별 지연")
+        self.day_report_table = self._report_table(
+            ["날짜", "전체", "재생", "누락", "실패", "건너뜀", "평균 지연(ms)", "최대 지연(ms)", "7일 실패율"]
+        )
+        self.report_tabs.addTab(self.day_report_table, "일별 신뢰도")
+        self.schedule_report_table = self._report_table(
+            ["순위", "이벤트", "전체", "재생", "누락", "실패", "실패율", "평균 지연(ms)", "최대 지연(ms)"]
+        )
+        self.report_tabs.addTab(self.schedule_report_table, "이벤트별 신뢰도")
+        layout.addWidget(self.report_tabs, 1)
 
         self.btn_log_refresh.clicked.connect(self.refresh_logs)
         self.log_range.currentIndexChanged.connect(self.refresh_logs)
         self.log_result.currentIndexChanged.connect(self.refresh_logs)
-        self.log_limit.valueChanged.connect(self.refresh_logs)
         self.log_keyword.returnPressed.connect(self.refresh_logs)
 
         self.log_from.setDate(QDate.currentDate().addDays(-6))
@@ -581,6 +639,22 @@ class MainWindow(QMainWindow):
         self.log_from.setEnabled(False)
         self.log_to.setEnabled(False)
 
+    def _report_table(self, headers):
+        table = QTableWidget()
+        table.setColumnCount(len(headers))
+        table.setHorizontalHeaderLabels(headers)
+        table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        table.setAlternatingRowColors(True)
+        table.verticalHeader().setVisible(False)
+        table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+        return table
+
+    def _fill_report(self, table, rows):
+        table.setRowCount(len(rows))
+        for r, values in enumerate(rows):
+            for c, v in enumerate(values):
+                table.setItem(r, c, QTableWidgetItem("-" if v is None else str(v)))
+
     def _build_settings(self):
         layout = QVBoxLayout(self.tab_settings)
         layout.setContentsMargins(18, 18, 18, 18)
@@ -591,6 +665,121 @@ class MainWindow(QMainWindow):
         self.chk_startup.stateChanged.connect(self.on_toggle_startup)
 
         layout.addWidget(self.chk_startup)
+
+        box = QGroupBox("로그 보관")
+        box_layout = QVBoxLayout(box)
+
+        row = QHBoxLayout()
+        row.addWidget(QLabel("원본 로그 보관 기간(일, 0=무제한)"))
+        self.spin_log_retention = QSpinBox()
+        self.spin_log_retention.setRange(0, 3650)
+        self.spin_log_retention.setValue(int(repo.get_setting(self.conn, "log_retention_days", repo.LOG_RETENTION_DAYS)))
+        row.addWidget(self.spin_log_retention)
+        row.addStretch(1)
+        box_layout.addLayout(row)
+
+        self.chk_log_archive = QCheckBox("기간이 지난 원본 로그는 아카이브에 보관 (해제 시 삭제)")
+        self.chk_log_archive.setChecked(repo.get_setting(self.conn, "log_archive", "1") == "1")
+        box_layout.addWidget(self.chk_log_archive)
+
+        self.btn_log_rollup = QPushButton("지금 정리")
+        self.btn_log_rollup.setObjectName("Ghost")
+        box_layout.addWidget(self.btn_log_rollup, 0, Qt.AlignmentFlag.AlignLeft)
+
+        self.spin_log_retention.valueChanged.connect(lambda v: repo.set_setting(self.conn, "log_retention_days", v))
+        self.chk_log_archive.stateChanged.connect(lambda _: repo.set_setting(self.conn, "log_archive", "1" if self.chk_log_archive.isChecked() else "0"))
+        self.btn_log_rollup.clicked.connect(self.on_log_rollup)
+
+        layout.addWidget(box)
+
+        cbox = QGroupBox("종소리 캐시")
+        cbox_layout = QVBoxLayout(cbox)
+
+        row = QHBoxLayout()
+        row.addWidget(QLabel("메모리 한도(MB)"))
+        self.spin_sound_cache = QSpinBox()
+        self.spin_sound_cache.setRange(0, 1024)
+        self.spin_sound_cache.setValue(self._sound_cache_mb())
+        row.addWidget(self.spin_sound_cache)
+        btn_cache_refresh = QPushButton("새로고침")
+        btn_cache_refresh.setObjectName("Ghost")
+        row.addWidget(btn_cache_refresh)
+        row.addStretch(1)
+        cbox_layout.addLayout(row)
+
+        self.lbl_sound_cache = QLabel("")
+        self.lbl_sound_cache.setObjectName("Muted")
+        cbox_layout.addWidget(self.lbl_sound_cache)
+
+        self.spin_sound_cache.valueChanged.connect(self.on_sound_cache_budget)
+        btn_cache_refresh.clicked.connect(self.refresh_sound_cache)
+        self.refresh_sound_cache()
+
+        layout.addWidget(cbox)
+
+        bbox = QGroupBox("백업")
+        bbox_layout = QVBoxLayout(bbox)
+
+        self.lbl_backup = QLabel("")
+        self.lbl_backup.setObjectName("Muted")
+        bbox_layout.addWidget(self.lbl_backup)
+
+        row = QHBoxLayout()
+        self.btn_backup = QPushButton("지금 백업")
+        self.btn_backup.setObjectName("Ghost")
+        self.btn_restore = QPushButton("복원…")
+        self.btn_restore.setObjectName("Ghost")
+        row.addWidget(self.btn_backup)
+        row.addWidget(self.btn_restore)
+        row.addStretch(1)
+        bbox_layout.addLayout(row)
+
+        self.btn_backup.clicked.connect(self.on_backup_now)
+        self.btn_restore.clicked.connect(self.on_restore_backup)
+
+        layout.addWidget(bbox)
+
+        self.backup_job = None
+        self.backup_timer = QTimer(self)
+        self.backup_timer.setInterval(BACKUP_CHECK_MS)
+        self.backup_timer.timeout.connect(self._maybe_auto_backup)
+        self.backup_timer.start()
+        QTimer.singleShot(BACKUP_FIRST_CHECK_MS, self._maybe_auto_backup)
+        self._refresh_backup_label()
+
+        if hasattr(self.conn, "stats"):
+            prof = QGroupBox("쿼리 프로파일")
+            prof_layout = QVBoxLayout(prof)
+
+            self.profile_table = QTableWidget()
+            self.profile_table.setColumnCount(7)
+            self.profile_table.setHorizontalHeaderLabels(["호출", "횟수", "합계(ms)", "평균(ms)", "최대(ms)", "행", "SQL"])
+            self.profile_table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+            self.profile_table.setAlternatingRowColors(True)
+            self.profile_table.verticalHeader().setVisible(False)
+            self.profile_table.horizontalHeader().setStretchLastSection(True)
+            prof_layout.addWidget(self.profile_table)
+
+            row = QHBoxLayout()
+            btn_refresh = QPushButton("새로고침")
+            btn_refresh.setObjectName("Ghost")
+            btn_reset = QPushButton("초기화")
+            btn_reset.setObjectName("Ghost")
+            btn_dump = QPushButton("JSON 저장")
+            btn_dump.setObjectName("Ghost")
+            row.addWidget(btn_refresh)
+            row.addWidget(btn_reset)
+            row.addWidget(btn_dump)
+            row.addStretch(1)
+            prof_layout.addLayout(row)
+
+            btn_refresh.clicked.connect(self.refresh_profile)
+            btn_reset.clicked.connect(self.on_profile_reset)
+            btn_dump.clicked.connect(self.on_profile_dump)
+
+            layout.addWidget(prof, 1)
+            self.refresh_profile()
+
         layout.addStretch(1)
 
     def _build_topbar(self):
@@ -692,9 +881,50 @@ class MainWindow(QMainWindow):
         except:
             return None
 
+    def showEvent(self, event):
+        super().showEvent(event)
+        if self.clock_timer is not None:
+            self.refresh_clock()
+            self.clock_timer.start()
+
+    def hideEvent(self, event):
+        super().hideEvent(event)
+        if self.clock_timer is not None:
+            self.clock_timer.stop()
+
+    def _arm_wakeup(self):
+        if self.wake_timer is None:
+            return
+        delay = self.scheduler.next_wakeup()
+        self._publish_deadline()
+        if delay is None:
+            self.wake_timer.stop()
+            return
+        self.wake_timer.start(int(math.ceil(delay * 1000)))
+
+    def _publish_deadline(self):
+        now = datetime.now()
+        ev = self.scheduler.next_event
+        if ev is None or not self.scheduler.running or self.scheduler.paused or self.scheduler.day.get(now).paused:
+            self.db.set_deadline(None)
+            return
+        self.db.set_deadline(time.monotonic() + (ev.run_at - now).total_seconds())
+
+    def on_wakeup(self):
+        self.scheduler.on_wakeup()
+        self.maintenance.run_if_due()
+        self._arm_wakeup()
+        if self.isVisible():
+            self.refresh_clock()
+            self.refresh_set_previews()
+
     def on_tick(self):
         self.scheduler.tick()
+        self.maintenance.run_if_due()
+        self._publish_deadline()
+        self.refresh_clock()
 
+    def refresh_clock(self):
         now = datetime.now()
         self.label_now.setText(now.strftime("현재: %Y-%m-%d %H:%M:%S"))
 
@@ -708,12 +938,86 @@ class MainWindow(QMainWindow):
             self.label_next.setText("다음: 없음")
 
         state = "실행중"
-        if repo.is_pause_today(self.conn, self._today_str()):
+        if self.scheduler.day.get(now).paused:
             state = "오늘 자동정지"
         elif self.scheduler.paused:
             state = "일시정지"
         self.label_state.setText(f"상태: {state}")
 
+    def on_data_changed(self, kind, op, key):
+        if kind == "schedule":
+            self._patch_schedule_row(op, key)
+        elif kind == "sound":
+            self._patch_sound_row(op, key)
+            self.refresh_ops_sounds()
+            if op == "update":
+                for r in range(self.schedule_table.rowCount()):
+                    item = self.schedule_table.item(r, 5)
+                    if item is not None and item.data(Qt.ItemDataRole.UserRole) == int(key):
+                        self._patch_schedule_row("update", int(self.schedule_table.item(r, 0).text()))
+        elif kind == "schedule_set":
+            self.refresh_schedule_sets()
+            if op == "reload" and key == repo.active_set_id(self.conn):
+                self.refresh_schedules()
+                self.refresh_sounds()
+                self.refresh_ops_sounds()
+        elif kind == "setting" and key == "active_set_id":
+            self.refresh_schedule_sets()
+            self.refresh_schedules()
+        else:
+            return
+
+        self._arm_wakeup()
+        self.refresh_clock()
+
+    def _find_row(self, table, row_id):
+        text = str(row_id)
+        for r in range(table.rowCount()):
+            item = table.item(r, 0)
+            if item is not None and item.text() == text:
+                return r
+        return None
+
+    def _patch_schedule_row(self, op, schedule_id):
+        r = self._find_row(self.schedule_table, schedule_id)
+        if r is not None:
+            self.schedule_table.removeRow(r)
+        if op == "delete":
+            return
+
+        s = repo.get_schedule(self.conn, schedule_id)
+        if s is None or int(s["set_id"]) != repo.active_set_id(self.conn):
+            return
+        day_bit = int(self.sch_day_filter.currentData() or 0)
+        if day_bit != 0 and (int(s["weekday_mask"]) & day_bit) == 0:
+            return
+
+        key = (str(s["time_hhmm"]), int(s["id"]))
+        pos = self.schedule_table.rowCount()
+        for i in range(self.schedule_table.rowCount()):
+            if (self.schedule_table.item(i, 3).text(), int(self.schedule_table.item(i, 0).text())) > key:
+                pos = i
+                break
+        self.schedule_table.insertRow(pos)
+        self._set_schedule_row(pos, s)
+
+    def _patch_sound_row(self, op, sound_id):
+        r = self._find_row(self.sound_table, sound_id)
+        if op == "delete":
+            if r is not None:
+                self.sound_table.removeRow(r)
+            return
+
+        s = self.conn.execute("SELECT * FROM sounds WHERE id=?", (int(sound_id),)).fetchone()
+        if s is None:
+            return
+        if r is None:
+            r = 0
+            while r < self.sound_table.rowCount() and int(self.sound_table.item(r, 0).text()) > int(sound_id):
+                r += 1
+            self.sound_table.insertRow(r)
+        self._set_sound_row(r, s)
+
     def refresh_all(self):
         self.refresh_logs()
         self.refresh_sounds()
@@ -722,10 +1026,10 @@ class MainWindow(QMainWindow):
         self.refresh_ops_sounds()
 
         self.scheduler.recompute_next()
+        self._arm_wakeup()
 
-        today = self._today_str()
         self.chk_pause_today.blockSignals(True)
-        self.chk_pause_today.setChecked(repo.is_pause_today(self.conn, today))
+        self.chk_pause_today.setChecked(self.scheduler.day.get(datetime.now()).paused)
         self.chk_pause_today.blockSignals(False)
 
     def refresh_ops_sounds(self):
@@ -746,10 +1050,13 @@ class MainWindow(QMainWindow):
         sounds = repo.list_sounds(self.conn)
         self.sound_table.setRowCount(len(sounds))
         for r, s in enumerate(sounds):
-            self.sound_table.setItem(r, 0, QTableWidgetItem(str(s["id"])))
-            self.sound_table.setItem(r, 1, QTableWidgetItem(str(s["name"])))
-            self.sound_table.setItem(r, 2, QTableWidgetItem(str(s["file_name"])))
-            self.sound_table.setItem(r, 3, QTableWidgetItem(self._vol_to_percent_text(s["volume"])))
+            self._set_sound_row(r, s)
+
+    def _set_sound_row(self, r, s):
+        self.sound_table.setItem(r, 0, QTableWidgetItem(str(s["id"])))
+        self.sound_table.setItem(r, 1, QTableWidgetItem(str(s["name"])))
+        self.sound_table.setItem(r, 2, QTableWidgetItem(str(s["file_name"])))
+        self.sound_table.setItem(r, 3, QTableWidgetItem(self._vol_to_percent_text(s["volume"])))
 
     def refresh_schedules(self):
         set_id = repo.active_set_id(self.conn)
@@ -760,15 +1067,21 @@ class MainWindow(QMainWindow):
 
         self.schedule_table.setRowCount(len(schedules))
         for r, s in enumerate(schedules):
-            self.schedule_table.setItem(r, 0, QTableWidgetItem(str(s["id"])))
-            self.schedule_table.setItem(r, 1, QTableWidgetItem("ON" if int(s["enabled"]) == 1 else "OFF"))
-            self.schedule_table.setItem(r, 2, QTableWidgetItem(self._mask_to_days(s["weekday_mask"])))
-            self.schedule_table.setItem(r, 3, QTableWidgetItem(str(s["time_hhmm"])))
-            self.schedule_table.setItem(r, 4, QTableWidgetItem(str(s["name"])))
-            self.schedule_table.setItem(r, 5, QTableWidgetItem(str(s["sound_name"])))
+            self._set_schedule_row(r, s)
+
+    def _set_schedule_row(self, r, s):
+        self.schedule_table.setItem(r, 0, QTableWidgetItem(str(s["id"])))
+        self.schedule_table.setItem(r, 1, QTableWidgetItem("ON" if int(s["enabled"]) == 1 else "OFF"))
+        self.schedule_table.setItem(r, 2, QTableWidgetItem(self._mask_to_days(s["weekday_mask"])))
+        self.schedule_table.setItem(r, 3, QTableWidgetItem(str(s["time_hhmm"])))
+        self.schedule_table.setItem(r, 4, QTableWidgetItem(str(s["name"])))
 
-            v = s["volume_override"] if s["volume_override"] is not None else s["sound_volume"]
-            self.schedule_table.setItem(r, 6, QTableWidgetItem(self._vol_to_percent_text(v)))
+        sound_item = QTableWidgetItem(str(s["sound_name"]))
+        sound_item.setData(Qt.ItemDataRole.UserRole, int(s["sound_id"]))
+        self.schedule_table.setItem(r, 5, sound_item)
+
+        v = s["volume_override"] if s["volume_override"] is not None else s["sound_volume"]
+        self.schedule_table.setItem(r, 6, QTableWidgetItem(self._vol_to_percent_text(v)))
 
     def on_add_sound(self):
         dlg = AddSoundDialog(self)
@@ -818,9 +1131,6 @@ class MainWindow(QMainWindow):
             shutil.copy2(str(src), str(dst))
             repo.insert_sound(self.conn, name, file_name, float(vol_percent) / 100.0)
 
-            self.scheduler.recompute_next()
-            self.refresh_all()
-
         except Exception as e:
             QMessageBox.critical(self, "종소리 추가 실패", str(e))
 
@@ -843,8 +1153,6 @@ class MainWindow(QMainWindow):
             return
 
         repo.update_sound(self.conn, sound_id, name, vol)
-        self.scheduler.recompute_next()
-        self.refresh_all()
 
     def on_delete_sound(self):
         sound_id = self._selected_row_id(self.sound_table)
@@ -868,10 +1176,6 @@ class MainWindow(QMainWindow):
             except:
                 pass
 
-        repo.clear_transient_overrides(self.conn, self._today_str())
-        self.scheduler.recompute_next()
-        self.refresh_all()
-
     def on_add_schedule(self):
         sounds = repo.list_sounds(self.conn)
         if not sounds:
@@ -890,21 +1194,11 @@ class MainWindow(QMainWindow):
         set_id = repo.active_set_id(self.conn)
         repo.insert_schedule(self.conn, set_id, name, mask, t, sound_id, v_override, enabled)
 
-        repo.clear_transient_overrides(self.conn, self._today_str())
-        self.scheduler.recompute_next()
-        self.refresh_all()
-
     def on_edit_schedule(self):
         schedule_id = self._selected_row_id(self.schedule_table)
         if not schedule_id:
             return
-        set_id = repo.active_set_id(self.conn)
-        schedules = repo.list_schedules(self.conn, set_id)
-        data = None
-        for s in schedules:
-            if int(s["id"]) == int(schedule_id):
-                data = s
-                break
+        data = repo.get_schedule(self.conn, schedule_id)
         if not data:
             return
 
@@ -918,12 +1212,9 @@ class MainWindow(QMainWindow):
             QMessageBox.warning(self, "오류", "이벤트명과 요일을 설정해 주세요.")
             return
 
+        repo.clear_transient_overrides(self.conn, self._today_str(), schedule_id)
         repo.update_schedule(self.conn, schedule_id, name, mask, t, sound_id, v_override, enabled)
 
-        repo.clear_transient_overrides(self.conn, self._today_str())
-        self.scheduler.recompute_next()
-        self.refresh_all()
-
     def on_delete_schedule(self):
         schedule_id = self._selected_row_id(self.schedule_table)
         if not schedule_id:
@@ -933,12 +1224,9 @@ class MainWindow(QMainWindow):
         if ok != QMessageBox.StandardButton.Yes:
             return
 
+        repo.clear_transient_overrides(self.conn, self._today_str(), schedule_id)
         repo.delete_schedule(self.conn, schedule_id)
 
-        repo.clear_transient_overrides(self.conn, self._today_str())
-        self.scheduler.recompute_next()
-        self.refresh_all()
-
     def on_ring_selected_sound(self):
         sid = self.ops_sound_combo.currentData()
         if sid is None:
@@ -983,18 +1271,29 @@ class MainWindow(QMainWindow):
         start_date, end_date = self._log_dates_from_range()
         result_value = self.log_result.currentData()
         keyword = self.log_keyword.text().strip()
-        limit_count = self.log_limit.value()
 
-        logs = repo.list_logs(self.conn, start_date, end_date, result_value, keyword, limit_count)
+        self.log_model.set_filters(start_date, end_date, result_value, keyword)
 
-        self.log_table.setRowCount(len(logs))
-        for r, l in enumerate(logs):
-            self.log_table.setItem(r, 0, QTableWidgetItem(str(l["id"])))
-            self.log_table.setItem(r, 1, QTableWidgetItem(str(l["occurred_at"])))
-            self.log_table.setItem(r, 2, QTableWidgetItem(str(l["result"])))
-            self.log_table.setItem(r, 3, QTableWidgetItem(str(l["schedule_name"] or "")))
-            self.log_table.setItem(r, 4, QTableWidgetItem(str(l["sound_name"] or "")))
-            self.log_table.setItem(r, 5, QTableWidgetItem(str(l["detail"] or "")))
+        try:
+            stats = repo.latency_by_day(self.reader, start_date, end_date)
+            days = reports.by_day(self.reader, start_date, end_date)
+            per_schedule = reports.by_schedule(self.reader, start_date, end_date)
+        except sqlite3.OperationalError:
+            return
+        self._fill_report(self.latency_table, [
+            (d["day"], d["count"], d["p50"], d["p95"], d["p99"], f'{d["preload_hits"]}/{d["count"]}')
+            for d in stats
+        ])
+        self._fill_report(self.day_report_table, [
+            (d["day"], d["total"], d["played"], d["missed"], d["failed"], d["skipped"],
+             d["latency_avg"], d["latency_max"], f'{d["rolling_fail_pct"]:.1f}%')
+            for d in days
+        ])
+        self._fill_report(self.schedule_report_table, [
+            (d["fail_rank"], d["schedule_name"], d["total"], d["played"], d["missed"], d["failed"],
+             f'{d["fail_pct"]:.1f}%', d["latency_avg"], d["latency_max"])
+            for d in per_schedule
+        ])
 
     def _log_dates_from_range(self):
         today = QDate.currentDate()
@@ -1021,12 +1320,13 @@ class MainWindow(QMainWindow):
         return self.log_from.date().toString("yyyy-MM-dd"), self.log_to.date().toString("yyyy-MM-dd")
 
     def on_log_detail(self, row, col):
-        id_item = self.log_table.item(row, 0)
-        if not id_item:
+        log_id = self.log_model.log_id(row)
+        if log_id is None:
+            return
+        try:
+            log = self.reader.execute("SELECT * FROM logs WHERE id=?", (log_id,)).fetchone()
+        except sqlite3.OperationalError:
             return
-
-        log_id = id_item.text()
-        log = self.conn.execute("SELECT * FROM logs WHERE id=?", (log_id,)).fetchone()
         if not log:
             return
 
@@ -1037,8 +1337,152 @@ class MainWindow(QMainWindow):
             f"종소리: {log['sound_name'] or '-'}\n\n"
             f"상세:\n{log['detail'] or ''}"
         )
+        if log["scheduled_at"]:
+            hit = log["preload_hit"]
+            text += (
+                f"\n\n예정: {log['scheduled_at']}\n"
+                f"감지: {log['detected_at'] or '-'}\n"
+                f"재생: {log['played_at'] or '-'}\n"
+                f"지연: {'-' if log['latency_ms'] is None else str(log['latency_ms']) + 'ms'}\n"
+                f"프리로드: {'-' if hit is None else ('적중' if hit else '실패')}"
+            )
         QMessageBox.information(self, "로그 상세", text)
 
+    def on_log_rollup(self):
+        n = repo.apply_log_retention(self.conn)
+        self.refresh_logs()
+        QMessageBox.information(self, "로그 정리", f"원본 로그 {n}건을 일별 집계로 정리했습니다.")
+
+    def _refresh_backup_label(self):
+        job = self.backup_job
+        if job is not None and not job.done:
+            pct = 0 if not job.total else int(100 * (job.total - job.remaining) / job.total)
+            self.lbl_backup.setText(f"백업 중… {pct}%")
+            return
+
+        snaps = list_snapshots(backups_dir())
+        if not snaps:
+            self.lbl_backup.setText("백업 없음")
+            return
+        text = f"마지막 백업: {snapshot_time(snaps[0]).strftime('%Y-%m-%d %H:%M:%S')} (보관 {len(snaps)}개)"
+        if job is not None and job.error is not None:
+            text += f"\n최근 백업 실패: {job.error}"
+        self.lbl_backup.setText(text)
+
+    def _start_backup(self):
+        if self.backup_job is not None and not self.backup_job.done:
+            return False
+        try:
+            keep = int(repo.get_setting(self.conn, "backup_keep", BACKUP_KEEP))
+        except:
+            keep = BACKUP_KEEP
+        self.backup_job = self.db.backup(backups_dir(), keep)
+        self.btn_backup.setEnabled(False)
+        self.btn_restore.setEnabled(False)
+        QTimer.singleShot(BACKUP_POLL_MS, self._poll_backup)
+        self._refresh_backup_label()
+        return True
+
+    def _poll_backup(self):
+        self._refresh_backup_label()
+        if not self.backup_job.done:
+            QTimer.singleShot(BACKUP_POLL_MS, self._poll_backup)
+            return
+        self.btn_backup.setEnabled(True)
+        self.btn_restore.setEnabled(True)
+
+    def _maybe_auto_backup(self):
+        snaps = list_snapshots(backups_dir())
+        if snaps and snapshot_time(snaps[0]).date() >= datetime.now().date():
+            return
+        self._start_backup()
+
+    def on_backup_now(self):
+        self._start_backup()
+
+    def on_restore_backup(self):
+        if self.backup_job is not None and not self.backup_job.done:
+            return
+
+        snaps = list_snapshots(backups_dir())
+        if not snaps:
+            QMessageBox.information(self, "복원", "복원할 백업이 없습니다.")
+            return
+
+        labels = [
+            f"{snapshot_time(p).strftime('%Y-%m-%d %H:%M:%S')}  ({p.stat().st_size / 1048576:.1f} MB)"
+            for p in snaps
+        ]
+        label, ok = QInputDialog.getItem(self, "복원", "복원할 시점을 선택하세요.", labels, 0, False)
+        if not ok:
+            return
+        snap = snaps[labels.index(label)]
+
+        ret = QMessageBox.question(
+            self,
+            "복원",
+            f"{label} 시점으로 되돌릴까요?\n현재 상태는 복원 전에 새 백업으로 저장됩니다."
+        )
+        if ret != QMessageBox.StandardButton.Yes:
+            return
+
+        try:
+            self.db.restore(snap, backups_dir())
+        except Exception as e:
+            QMessageBox.warning(self, "오류", f"복원 실패: {e}")
+            return
+
+        self.scheduler.reload()
+        self.refresh_all()
+        self._arm_wakeup()
+        self._refresh_backup_label()
+        QMessageBox.information(self, "복원", "복원했습니다.")
+
+    def _sound_cache_mb(self):
+        try:
+            return int(repo.get_setting(self.conn, "sound_cache_mb", SOUND_CACHE_MB))
+        except:
+            return SOUND_CACHE_MB
+
+    def on_sound_cache_budget(self, mb):
+        repo.set_setting(self.conn, "sound_cache_mb", mb)
+        self.player.sounds.set_budget(mb * 1024 * 1024)
+        self.refresh_sound_cache()
+
+    def refresh_sound_cache(self):
+        st = self.player.sounds.stats()
+        lookups = st["hits"] + st["misses"]
+        rate = f'{100.0 * st["hits"] / lookups:.0f}%' if lookups else "-"
+        self.lbl_sound_cache.setText(
+            f'{st["items"]}개 / {st["bytes"] / 1048576:.1f}MB 사용, '
+            f'적중 {st["hits"]} · 실패 {st["misses"]} (적중률 {rate}), 제거 {st["evictions"]}'
+        )
+
+    def refresh_profile(self):
+        stats = self.conn.stats.snapshot()
+        self.profile_table.setRowCount(len(stats))
+        for r, d in enumerate(stats):
+            self.profile_table.setItem(r, 0, QTableWidgetItem(d["caller"]))
+            self.profile_table.setItem(r, 1, QTableWidgetItem(str(d["count"])))
+            self.profile_table.setItem(r, 2, QTableWidgetItem(f'{d["total_ms"]:.1f}'))
+            self.profile_table.setItem(r, 3, QTableWidgetItem(f'{d["avg_ms"]:.2f}'))
+            self.profile_table.setItem(r, 4, QTableWidgetItem(f'{d["max_ms"]:.1f}'))
+            self.profile_table.setItem(r, 5, QTableWidgetItem(str(d["rows"])))
+            self.profile_table.setItem(r, 6, QTableWidgetItem(d["sql"]))
+
+    def on_profile_reset(self):
+        self.conn.stats.reset()
+        self.refresh_profile()
+
+    def on_profile_dump(self):
+        path = profile_target() or str(app_data_dir() / PROFILE_FILE)
+        try:
+            self.conn.stats.dump(path)
+        except Exception as e:
+            QMessageBox.warning(self, "쿼리 프로파일", f"저장 실패: {e}")
+            return
+        QMessageBox.information(self, "쿼리 프로파일", f"저장했습니다.\n{path}")
+
     def on_toggle_startup(self, state):
         if self.chk_startup.isChecked():
             enable_startup()
@@ -1062,6 +1506,17 @@ class MainWindow(QMainWindow):
         except:
             pass
 
+        try:
+            self.db.close()
+        except:
+            pass
+
+        if hasattr(self.conn, "stats") and profile_target():
+            try:
+                self.conn.stats.dump(profile_target())
+            except:
+                pass
+
         try:
             self.tray.hide()
         except:
@@ -1088,15 +1543,16 @@ class MainWindow(QMainWindow):
             self.sch_set_combo.setCurrentIndex(pick)
 
         self.sch_set_combo.blockSignals(False)
+        self.refresh_set_previews()
 
-    def on_change_schedule_set(self):
-        sid = self.sch_set_combo.currentData()
-        if sid is None:
-            return
-        repo.set_active_set(self.conn, int(sid))
-        repo.clear_transient_overrides(self.conn, self._today_str())
-        self.scheduler.recompute_next()
-        self.refresh_all()
+    def refresh_set_previews(self):
+        for i in range(self.sch_set_combo.count()):
+            ev = self.scheduler.preview_next(int(self.sch_set_combo.itemData(i)))
+            if ev:
+                tip = f'다음: {ev.run_at.strftime("%m-%d %H:%M")}  {ev.name}'
+            else:
+                tip = "다음: 없음"
+            self.sch_set_combo.setItemData(i, tip, Qt.ItemDataRole.ToolTipRole)
 
     def on_add_schedule_set(self):
         name, ok = QInputDialog.getText(self, "세트 추가", "세트 이름")
@@ -1107,11 +1563,8 @@ class MainWindow(QMainWindow):
             return
         try:
             sid = repo.insert_schedule_set(self.conn, name)
-            repo.set_active_set(self.conn, sid)
-            self.refresh_schedule_sets()
             repo.clear_transient_overrides(self.conn, self._today_str())
-            self.scheduler.recompute_next()
-            self.refresh_all()
+            repo.set_active_set(self.conn, sid)
         except Exception as e:
             QMessageBox.warning(self, "오류", str(e))
 
@@ -1128,7 +1581,6 @@ class MainWindow(QMainWindow):
             return
         try:
             repo.rename_schedule_set(self.conn, int(sid), name)
-            self.refresh_schedule_sets()
         except Exception as e:
             QMessageBox.warning(self, "오류", str(e))
 
@@ -1149,23 +1601,60 @@ class MainWindow(QMainWindow):
         try:
             repo.delete_schedule_set(self.conn, int(sid))
             remain = repo.list_schedule_sets(self.conn)
-            repo.set_active_set(self.conn, int(remain[0]["id"]))
-            self.refresh_schedule_sets()
             repo.clear_transient_overrides(self.conn, self._today_str())
-            self.scheduler.recompute_next()
-            self.refresh_all()
+            repo.set_active_set(self.conn, int(remain[0]["id"]))
         except Exception as e:
             QMessageBox.warning(self, "오류", str(e))
 
-    def on_change_schedule_set(self):
+    def on_import_schedule_set(self):
         sid = self.sch_set_combo.currentData()
         if sid is None:
             return
 
-        repo.set_active_set(self.conn, int(sid))
+        path, _ = QFileDialog.getOpenFileName(self, "시간표 가져오기", "", "시간표 (*.csv *.json)")
+        if not path:
+            return
 
-        repo.clear_transient_overrides(self.conn, self._today_str())
-        self.scheduler.recompute_next()
+        ret = QMessageBox.question(
+            self,
+            "시간표 가져오기",
+            "현재 세트의 기존 시간표를 지우고 가져올까요?\n(아니오: 기존 시간표 뒤에 추가)",
+            QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No | QMessageBox.StandardButton.Cancel,
+            QMessageBox.StandardButton.No
+        )
+        if ret == QMessageBox.StandardButton.Cancel:
+            return
 
-        self.refresh_schedules()
-        self.on_tick()
\ No newline at end of file
+        try:
+            if ret == QMessageBox.StandardButton.Yes:
+                repo.clear_transient_overrides(self.conn, self._today_str())
+            n = import_set(self.conn, int(sid), path, replace=(ret == QMessageBox.StandardButton.Yes))
+        except Exception as e:
+            QMessageBox.warning(self, "오류", str(e))
+            return
+        QMessageBox.information(self, "시간표 가져오기", f"{n}개의 시간표를 가져왔습니다.")
+
+    def on_export_schedule_set(self):
+        sid = self.sch_set_combo.currentData()
+        if sid is None:
+            return
+
+        default = f"{self.sch_set_combo.currentText()}.csv"
+        path, _ = QFileDialog.getSaveFileName(self, "시간표 내보내기", default, "CSV (*.csv);;JSON (*.json)")
+        if not path:
+            return
+
+        try:
+            n = export_set(self.conn, int(sid), path)
+        except Exception as e:
+            QMessageBox.warning(self, "오류", str(e))
+            return
+        QMessageBox.information(self, "시간표 내보내기", f"{n}개의 시간표를 저장했습니다.\n{path}")
+
+    def on_change_schedule_set(self):
+        sid = self.sch_set_combo.currentData()
+        if sid is None:
+            return
+
+        repo.clear_transient_overrides(self.conn, self._today_str())
+        repo.set_active_set(self.conn, int(sid))
\ No newline at end of file
@@ -0,0 +1,101 @@
+import random
+import sqlite3
+import time
+from datetime import datetime, timedelta
+
+from app.data import repo
+from app.data.db import init_schema, read_schema
+from app.core.scheduler import Scheduler, next_dt, weekday_bit
+
+SCHEDULES = 5000
+RUNS = 5
+
+def make_db():
+    conn = sqlite3.connect(":memory:")
+    conn.row_factory = sqlite3.Row
+    init_schema(conn, read_schema())
+    conn.execute("INSERT INTO sounds(name, file_name, volume) VALUES('bell1', 'bell1.wav', 1.0)")
+
+    rnd = random.Random(42)
+    rows = []
+    for i in range(SCHEDULES):
+        rows.append((
+            1, f"bell{i}", rnd.choice([31, 96, 127, 1 << rnd.randint(0, 6)]),
+            f"{rnd.randint(0, 23):02d}:{rnd.randint(0, 59):02d}", 1, None, 1
+        ))
+    conn.executemany("""
+        INSERT INTO schedules(set_id, name, weekday_mask, time_hhmm, sound_id, volume_override, enabled)
+        VALUES(?,?,?,?,?,?,?)
+    """, rows)
+
+    today = datetime.now()
+    for d in range(1, 8):
+        date_str = (today + timedelta(days=d)).strftime("%Y-%m-%d")
+        for sid in rnd.sample(range(1, SCHEDULES + 1), SCHEDULES // 2):
+            conn.execute(
+                "INSERT INTO overrides(date_yyyymmdd, schedule_id, action, note) VALUES(?,?,?,?)",
+                (date_str, sid, rnd.choice(["SKIP_ONCE", "FIRED_ONCE"]), "")
+            )
+    conn.commit()
+    return conn
+
+def legacy_recompute(conn):
+    now = datetime.now()
+    schedules = repo.list_schedules(conn, repo.active_set_id(conn))
+    best = None
+    for day_offset in range(0, 8):
+        base = (now + timedelta(days=day_offset)).replace(hour=0, minute=0, second=0, microsecond=0)
+        date_str = base.strftime("%Y-%m-%d")
+        day_bit = weekday_bit(base)
+        for s in schedules:
+            if int(s["enabled"]) != 1:
+                continue
+            if (int(s["weekday_mask"]) & day_bit) == 0:
+                continue
+            run_at = next_dt(base, str(s["time_hhmm"]))
+            if day_offset == 0 and run_at <= now:
+                continue
+            sid = int(s["id"])
+            if repo.has_override(conn, date_str, sid, "SKIP_ONCE"):
+                continue
+            if repo.has_override(conn, date_str, sid, "FIRED_ONCE"):
+                continue
+            if best is None or run_at < best[1]:
+                best = (sid, run_at)
+        if best is not None:
+            break
+    return best
+
+def measure(conn, fn):
+    queries = []
+    conn.set_trace_callback(queries.append)
+    fn()
+    conn.set_trace_callback(None)
+
+    t0 = time.perf_counter()
+    for _ in range(RUNS):
+        fn()
+    ms = (time.perf_counter() - t0) * 1000.0 / RUNS
+    return len(queries), ms
+
+def main():
+    conn = make_db()
+    sch = Scheduler(conn, None)
+
+    def cold():
+        sch.invalidate()
+        sch.day = type(sch.day)(conn)
+        sch.recompute_next()
+
+    results = [
+        ("before (has_override per candidate)", measure(conn, lambda: legacy_recompute(conn))),
+        ("after, cold (timeline + OverrideIndex load)", measure(conn, cold)),
+        ("after, warm (cached timeline + index)", measure(conn, sch.recompute_next)),
+    ]
+
+    print(f"schedules={SCHEDULES} overrides={conn.execute('SELECT COUNT(*) FROM overrides').fetchone()[0]}")
+    for name, (count, ms) in results:
+        print(f"{name:<46} queries={count:<6} {ms:8.2f} ms")
+
+if __name__ == "__main__":
+    main()